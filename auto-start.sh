@@ -54,7 +54,23 @@ if ! command -v python3 &> /dev/null; then
 fi
 
 if [ "$IS_FIRST_RUN" = false ] && [ -f "$WORKDIR/proxysync/success_proxy.txt" ] && [ -s "$WORKDIR/proxysync/success_proxy.txt" ]; then
-    echo "   ⏭️  SKIP: ProxySync already ran (success_proxy.txt exists)."
+    # Warm restart: IP sync dulu (IP codespace bisa berubah setelah restart), lalu tes ulang
+    # hanya proxy yang verdict-nya kedaluwarsa. IP sync, download & konversi yang tidak berubah
+    # dilewati dengan cache, jadi langkah ini murah jika tidak ada yang berubah.
+    # Run incremental bisa menimpa/menghapus success_proxy.txt (mis. semua tes ulang gagal):
+    # simpan cadangan dan pulihkan jika run gagal atau hasilnya kosong.
+    SUCCESS_FILE="$WORKDIR/proxysync/success_proxy.txt"
+    SUCCESS_BACKUP="$SUCCESS_FILE.bak"
+    cp "$SUCCESS_FILE" "$SUCCESS_BACKUP"
+    echo "   ♻️  INCREMENTAL: success_proxy.txt exists, syncing IP & retesting stale verdicts only..."
+    python3 "$WORKDIR/proxysync/main.py" --full-auto --incremental
+    if [ $? -ne 0 ] || [ ! -s "$SUCCESS_FILE" ]; then
+        mv -f "$SUCCESS_BACKUP" "$SUCCESS_FILE"
+        echo "   ⚠️  WARNING: Incremental run failed or left no proxies, restored previous success_proxy.txt and continuing..."
+    else
+        rm -f "$SUCCESS_BACKUP"
+        echo "   ✓ Incremental run completed."
+    fi
 else
     # === PERBAIKAN: Gunakan $WORKDIR variabel ===
     python3 "$WORKDIR/proxysync/main.py" --full-auto
@@ -28,6 +28,13 @@ MASTER_PROXY_FILE = PROXYSYNC_DIR / "success_proxy.txt"
 FALLBACK_PROXY_FILE = PROXYSYNC_DIR / "proxy.txt"
 # === AKHIR PERBAIKAN ===
 
+sys.path.insert(0, str(PROXYSYNC_DIR))
+from ranking import rank_biased_shuffle # Implementasi yang sama dengan distribusi ProxySync
+
+# success_proxy.txt sudah di-ranking ProxySync (tercepat di atas).
+# True = shuffle berbobot ranking, proxy cepat cenderung di depan tiap file bot.
+PREFER_FAST_PROXIES = True
+
 TMUX_SESSION = "automation_hub_bots"
 POSSIBLE_VENV_NAMES = [".venv", "venv", "myenv"]
 DEFAULT_VENV_NAME = ".venv"
@@ -123,7 +130,7 @@ def distribute_proxies(proxies, paths):
                  target_filename = "proxy.txt"
             # === AKHIR PERBAIKAN ===
             
-        proxies_shuffled = random.sample(proxies, len(proxies))
+        proxies_shuffled = rank_biased_shuffle(proxies) if PREFER_FAST_PROXIES else random.sample(proxies, len(proxies))
         try:
             proxy_file_target.parent.mkdir(parents=True, exist_ok=True)
             with open(proxy_file_target, "w", encoding='utf-8') as f:
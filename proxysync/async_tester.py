@@ -0,0 +1,359 @@
+import asyncio
+import json
+import socket
+import ssl
+import time
+from urllib.parse import urlsplit
+
+import tester # Memakai konfigurasi & token yang sama dengan tester sync
+from tester import CheckResult, elapsed_ms
+
+# --- Konfigurasi Engine Async ---
+# Batas body yang dibaca per respons (cukup untuk validasi konten)
+MAX_BODY_BYTES = 64 * 1024
+# Body lebih besar dari ini tidak dihabiskan; koneksi ditutup alih-alih dipakai ulang
+MAX_DRAIN_BYTES = 1024 * 1024
+SSL_CONTEXT = ssl.create_default_context()
+
+class TunnelError(Exception):
+    """CONNECT ke proxy ditolak (status != 200)."""
+    def __init__(self, status):
+        super().__init__(f"CONNECT {status}")
+        self.status = status
+
+class PhaseTimeout(Exception):
+    """Satu fase koneksi (connect/tunnel/tls/response) melewati timeout-nya."""
+    def __init__(self, phase, seconds):
+        super().__init__(f"{phase} {seconds}s")
+        self.phase = phase
+        self.seconds = seconds
+
+async def _phase(awaitable, seconds, phase):
+    """asyncio.wait_for per fase; timeout diubah jadi PhaseTimeout agar fasenya terlihat."""
+    try:
+        return await asyncio.wait_for(awaitable, seconds)
+    except asyncio.TimeoutError:
+        raise PhaseTimeout(phase, seconds) from None
+
+async def _read_head(reader):
+    """Baca status line + header HTTP. Return (status_code, headers_dict)."""
+    return _parse_head(await reader.readuntil(b"\r\n\r\n"))
+
+def _parse_head(raw):
+    lines = raw.split(b"\r\n")
+    status = tester.parse_status_code(lines[0])
+    headers = {}
+    for line in lines[1:]:
+        if b":" in line:
+            key, value = line.decode("latin-1").split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return status, headers
+
+async def _read_body(reader, headers, drain=False):
+    """Baca body (Content-Length / chunked / sampai EOF), dipotong di MAX_BODY_BYTES.
+
+    Jika `drain`, sisa body (s/d MAX_DRAIN_BYTES) dibaca & dibuang agar koneksi bisa
+    dipakai ulang. Return (body, complete); complete = body habis terbaca sesuai framing.
+    """
+    budget = MAX_DRAIN_BYTES if drain else MAX_BODY_BYTES
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = b""
+        consumed = 0
+        while consumed < budget:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""): pass # Trailer
+                return body[:MAX_BODY_BYTES], True
+            chunk = await reader.readexactly(size)
+            consumed += size
+            if len(body) < MAX_BODY_BYTES: body += chunk
+            await reader.readexactly(2) # CRLF setelah chunk
+        return body[:MAX_BODY_BYTES], False
+    if "content-length" in headers:
+        length = int(headers["content-length"])
+        body = await reader.readexactly(min(length, MAX_BODY_BYTES))
+        remaining = length - len(body)
+        if remaining and drain and length <= MAX_DRAIN_BYTES:
+            while remaining:
+                remaining -= len(await reader.readexactly(min(remaining, 65536)))
+        return body, remaining == 0
+    return await reader.read(MAX_BODY_BYTES), False
+
+async def _open_socket(host, port):
+    """Socket TCP non-blocking yang sudah terhubung ke (host, port), dicoba per alamat DNS."""
+    loop = asyncio.get_running_loop()
+    error = None
+    for family, sock_type, proto, _, address in await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        sock = socket.socket(family, sock_type, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            return sock
+        except BaseException as e:
+            sock.close()
+            if not isinstance(e, OSError): raise
+            error = e
+    raise error or OSError(f"Alamat {host} tidak ditemukan")
+
+async def _sock_read_head(sock):
+    """Seperti _read_head, langsung dari socket (balasan CONNECT, sebelum TLS)."""
+    loop = asyncio.get_running_loop()
+    raw = b""
+    while b"\r\n\r\n" not in raw:
+        chunk = await loop.sock_recv(sock, 4096)
+        if not chunk or len(raw) > MAX_BODY_BYTES: raise asyncio.IncompleteReadError(raw, None)
+        raw += chunk
+    return _parse_head(raw)
+
+async def open_tunnel(proxy, target_host, target_port=443, timings=None):
+    """Buka koneksi TCP ke proxy, handshake CONNECT, lalu upgrade TLS ke target.
+
+    Jika `timings` (dict) diberikan, durasi fase connect/tunnel/tls (ms) dicatat.
+    Tiap fase dibatasi timeout adaptif (tester.TIMEOUTS) masing-masing.
+    """
+    timings = {} if timings is None else timings
+    timeouts = tester.TIMEOUTS
+    parts = urlsplit(proxy)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    # Handshake CONNECT langsung di socket, baru dibungkus stream TLS: StreamWriter.start_tls
+    # baru ada sejak Python 3.11 (devcontainer memakai 3.10)
+    sock = await _phase(_open_socket(parts.hostname, parts.port or 80), timeouts.connect, "connect")
+    timings["connect"] = elapsed_ms(start)
+    try:
+        start = time.perf_counter()
+        await loop.sock_sendall(sock, tester.build_connect_request(proxy, target_host, target_port))
+        status, _ = await _phase(_sock_read_head(sock), timeouts.read, "tunnel")
+        if status != 200: raise TunnelError(status)
+        timings["tunnel"] = elapsed_ms(start)
+        start = time.perf_counter()
+        tunnel = await _phase(asyncio.open_connection(sock=sock, ssl=SSL_CONTEXT, server_hostname=target_host), timeouts.read, "tls")
+        timings["tls"] = elapsed_ms(start)
+        return tunnel
+    except BaseException:
+        sock.close()
+        raise
+
+async def prescreen_proxy_async(proxy, target_host, target_port=443, timeout=None):
+    """Tahap 1 (async): TCP connect + CONNECT ke target. Return (ok, reason, timings)."""
+    timeout = timeout or tester.PRESCREEN_TIMEOUT
+    connect_timeout = min(timeout, tester.TIMEOUTS.connect)
+    parts = urlsplit(proxy)
+    writer = None
+    timings = {}
+
+    async def handshake():
+        nonlocal writer
+        start = time.perf_counter()
+        reader, writer = await _phase(asyncio.open_connection(parts.hostname, parts.port or 80), connect_timeout, "connect")
+        timings["connect"] = elapsed_ms(start)
+        start = time.perf_counter()
+        writer.write(tester.build_connect_request(proxy, target_host, target_port))
+        await writer.drain()
+        status_line = await _phase(reader.readline(), timeout, "tunnel")
+        timings["tunnel"] = elapsed_ms(start)
+        return status_line
+
+    try:
+        status_line = await handshake()
+    except PhaseTimeout as e:
+        if e.phase == "connect": return False, f"Prescreen Connect Timeout ({e.seconds}s)", timings
+        return False, f"Prescreen Timeout ({e.seconds}s)", timings
+    except OSError as e:
+        return False, f"Prescreen TCP ({tester.describe_os_error(e)})", timings
+    finally:
+        if writer is not None: writer.close()
+
+    status = tester.parse_status_code(status_line)
+    if status == 407: return False, "Proxy Auth (407)", timings
+    if status != 200: return False, f"Prescreen CONNECT ({status or 'invalid'})", timings
+    return True, "OK (prescreen)", timings
+
+async def fetch_via_proxy(proxy, url, headers):
+    """GET satu URL https lewat proxy. Return (status_code, body_text, timings_ms)."""
+    target = urlsplit(url)
+    path = target.path or "/"
+    if target.query: path += f"?{target.query}"
+    timings = {}
+    probe_start = time.perf_counter()
+    reader, writer = await open_tunnel(proxy, target.hostname, target.port or 443, timings)
+    try:
+        request_lines = [f"GET {path} HTTP/1.1", f"Host: {target.hostname}", "Connection: close"]
+        request_lines += [f"{k}: {v}" for k, v in headers.items()]
+        start = time.perf_counter()
+        writer.write(("\r\n".join(request_lines) + "\r\n\r\n").encode())
+        await writer.drain()
+        read_timeout = tester.TIMEOUTS.read
+        status, response_headers = await _phase(_read_head(reader), read_timeout, "response")
+        timings["ttfb"] = elapsed_ms(start)
+        body, _ = await _phase(_read_body(reader, response_headers), read_timeout, "body")
+        timings["total"] = elapsed_ms(probe_start)
+        return status, body.decode("utf-8", errors="ignore"), timings
+    finally:
+        writer.close()
+
+class ProxyHttpSession:
+    """Koneksi keep-alive lewat satu proxy: satu tunnel CONNECT + TLS per host target.
+
+    Tunnel dipakai ulang selama server tidak menutupnya dan body respons habis terbaca.
+    """
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.tunnels = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for _, writer in self.tunnels.values(): writer.close()
+        self.tunnels.clear()
+
+    async def fetch(self, url, headers):
+        """GET satu URL https. Return (status_code, body_text, timings_ms)."""
+        status, body, timings, _ = await self.fetch_with_headers(url, headers)
+        return status, body, timings
+
+    async def fetch_with_headers(self, url, headers):
+        """Seperti fetch(), plus dict header respons (key lowercase) sebagai elemen ke-4."""
+        target = urlsplit(url)
+        key = (target.hostname, target.port or 443)
+        tunnel = self.tunnels.pop(key, None)
+        if tunnel is not None:
+            try:
+                return await self._request(target, key, headers, {}, tunnel)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass # Server menutup koneksi idle; ulangi dengan tunnel baru
+        timings = {}
+        probe_start = time.perf_counter()
+        tunnel = await open_tunnel(self.proxy, key[0], key[1], timings)
+        return await self._request(target, key, headers, timings, tunnel, probe_start)
+
+    async def _request(self, target, key, headers, timings, tunnel, probe_start=None):
+        reader, writer = tunnel
+        probe_start = probe_start or time.perf_counter()
+        path = target.path or "/"
+        if target.query: path += f"?{target.query}"
+        try:
+            request_lines = [f"GET {path} HTTP/1.1", f"Host: {target.hostname}", "Connection: keep-alive"]
+            request_lines += [f"{k}: {v}" for k, v in headers.items()]
+            start = time.perf_counter()
+            writer.write(("\r\n".join(request_lines) + "\r\n\r\n").encode())
+            await writer.drain()
+            read_timeout = tester.TIMEOUTS.read
+            status, response_headers = await _phase(_read_head(reader), read_timeout, "response")
+            timings["ttfb"] = elapsed_ms(start)
+            body, complete = await _phase(_read_body(reader, response_headers, drain=True), read_timeout, "body")
+            timings["total"] = elapsed_ms(probe_start)
+        except BaseException:
+            writer.close()
+            raise
+        if complete and response_headers.get("connection", "").lower() != "close":
+            self.tunnels[key] = tunnel
+        else:
+            writer.close()
+        return status, body.decode("utf-8", errors="ignore"), timings, response_headers
+
+def _classify_error(e, name):
+    """Samakan pesan error dengan format tester sync (requests)."""
+    if isinstance(e, PhaseTimeout):
+        if e.phase == "connect": return f"Connect Timeout {name} ({e.seconds}s)"
+        return f"Timeout {name} ({e.phase} {e.seconds}s)"
+    if isinstance(e, asyncio.TimeoutError):
+        return f"Timeout {name} ({tester.PROXY_TIMEOUT}s)"
+    if isinstance(e, TunnelError):
+        if e.status == 407: return "Proxy Auth (407)"
+        return f"Proxy Error {name} ({str(e)[:30]})"
+    if isinstance(e, (ConnectionRefusedError, ConnectionResetError)):
+        return f"Proxy Error {name} ({e.__class__.__name__[:30]})"
+    return f"Koneksi Gagal {name} ({e.__class__.__name__})"
+
+async def check_proxy_final_async(proxy, is_auto=False):
+    if not tester.is_plain_http_proxy(proxy):
+        # Tunnel async hanya CONNECT plaintext; proxy https:// dites versi sync (requests) di thread
+        return await asyncio.to_thread(tester.check_proxy_final, proxy, is_auto)
+    if tester.PRESCREEN_ENABLED:
+        ok, reason, timings = await prescreen_proxy_async(proxy, tester.get_prescreen_target(is_auto))
+        if not ok: return CheckResult(proxy, False, reason, timings)
+    if is_auto:
+        result = await check_proxy_simple_async(proxy)
+    else:
+        result = await check_proxy_github_async(proxy)
+    if result[1]: tester.TIMEOUTS.observe(result.timings)
+    return result
+
+async def check_proxy_simple_async(proxy):
+    """Versi async dari tester.check_proxy_simple (ipify.org)."""
+    headers = {
+        'User-Agent': 'ProxySync-Tester-Simple/3.2',
+        'Accept': 'application/json'
+    }
+    try:
+        status, content, timings = await fetch_via_proxy(proxy, tester.IP_TEST_TARGET, headers)
+        if status == 407: return CheckResult(proxy, False, "Proxy Auth (407)")
+        if status >= 400: return CheckResult(proxy, False, f"Koneksi Gagal ipify (HTTP {status})")
+        data = json.loads(content)
+        if 'ip' in data:
+            return CheckResult(proxy, True, "OK (ipify.org)", timings, exit_ip=str(data['ip']).strip())
+        else:
+            return CheckResult(proxy, False, "Respons ipify?")
+    except (json.JSONDecodeError, ValueError) as e:
+        return CheckResult(proxy, False, f"Koneksi Gagal ipify ({e.__class__.__name__})")
+    except Exception as e:
+        return CheckResult(proxy, False, _classify_error(e, "ipify"))
+
+async def _run_github_probes_async(session, targets, api_headers, web_headers):
+    """Probe target GitHub berurutan lewat `session`. Return (reason gagal atau None, timings)."""
+    timings = {}
+    tokens = tester.GITHUB_TOKENS
+    for name, url in targets:
+        is_api = "api.github.com" in url
+        headers = api_headers if is_api else web_headers
+        try:
+            attempts = 0
+            while True:
+                # Rotasi token sama dengan tester._run_github_probes (jeda via asyncio.sleep)
+                token = None
+                if is_api and len(tokens):
+                    token, wait_seconds = tokens.acquire()
+                    if token is None:
+                        if wait_seconds > tester.GITHUB_TOKEN_MAX_WAIT or attempts > len(tokens): return tester.GITHUB_RATE_LIMIT_REASON, timings
+                        await asyncio.sleep(wait_seconds)
+                        attempts += 1
+                        continue
+                    headers = {**api_headers, 'Authorization': f'Bearer {token}'}
+                status, content, probe_timings, response_headers = await session.fetch_with_headers(url, headers)
+                if token is None or not tokens.update(token, status, response_headers, content): break
+                attempts += 1
+                if attempts > len(tokens): return tester.GITHUB_RATE_LIMIT_REASON, timings
+            if not timings: timings = probe_timings # Skor latency dari target pertama (API)
+        except Exception as e:
+            return _classify_error(e, name), timings
+
+        reason = tester.github_status_reason(status, name) or tester.github_content_reason(content, name, is_api)
+        if reason: return reason, timings
+    return None, timings
+
+async def check_proxy_github_async(proxy):
+    """Versi async dari tester.check_proxy_github, butuh PAT (satu ProxyHttpSession per proxy)."""
+    if tester.GITHUB_TEST_TOKEN is None:
+        return CheckResult(proxy, False, "Token GitHub?")
+
+    api_headers, web_headers = tester.github_test_headers()
+    api_targets, web_targets = tester.split_github_targets()
+
+    async with ProxyHttpSession(proxy) as session:
+        if tester.GITHUB_PROBE_CONCURRENT and api_targets and web_targets:
+            (api_reason, timings), (web_reason, _) = await asyncio.gather(
+                _run_github_probes_async(session, api_targets, api_headers, web_headers),
+                _run_github_probes_async(session, web_targets, api_headers, web_headers),
+            )
+            reason = api_reason or web_reason
+        else:
+            reason, timings = await _run_github_probes_async(session, tester.GITHUB_TEST_TARGETS, api_headers, web_headers)
+
+    if reason: return CheckResult(proxy, False, reason, rate_limited=reason == tester.GITHUB_RATE_LIMIT_REASON)
+    return CheckResult(proxy, True, "OK (All GitHub targets)", timings)
@@ -0,0 +1,101 @@
+"""Benchmark konversi proxylist: converter lama (readlines + regex per baris) vs proxy_parser (mmap per blok).
+
+Pemakaian: python bench_parser.py [jumlah_baris]   (default 1.000.000)
+Tiap mode dijalankan di subprocess terpisah agar peak RSS (ru_maxrss) tidak saling memengaruhi.
+"""
+import os
+import re
+import sys
+import time
+import random
+import resource
+import tempfile
+import subprocess
+
+import proxy_parser
+
+DEFAULT_LINES = 1_000_000
+MODES = ("legacy", "parser")
+
+def legacy_convert_line(p):
+    # Salinan logika convert_proxy_line sebelum proxy_parser (regex dikompilasi ulang per baris)
+    if p.startswith("http://") or p.startswith("https://"): return p
+    converted = None
+    host_pattern = r"((?:[0-9]{1,3}\.){3}[0-9]{1,3}|(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,})"
+    port_pattern = r"[0-9]{1,5}"
+    match_user_pass_host_port = re.match(rf"^(?P<user_pass>.+)@(?P<host>{host_pattern}):(?P<port>{port_pattern})$", p)
+    if match_user_pass_host_port:
+        user_pass = match_user_pass_host_port.group("user_pass")
+        host = match_user_pass_host_port.group("host")
+        port = match_user_pass_host_port.group("port")
+        if 1 <= int(port) <= 65535: converted = f"http://{user_pass}@{host}:{port}"
+    if not converted:
+        parts = p.split(':')
+        if len(parts) == 4:
+            ip, port, user, password = parts
+            if re.match(rf"^{host_pattern}$", ip) and re.match(rf"^{port_pattern}$", port):
+                if 1 <= int(port) <= 65535: converted = f"http://{user}:{password}@{ip}:{port}"
+        elif len(parts) == 2:
+            ip, port = parts
+            if re.match(rf"^{host_pattern}$", ip) and re.match(rf"^{port_pattern}$", port):
+                if 1 <= int(port) <= 65535: converted = f"http://{ip}:{port}"
+    return converted
+
+def run_legacy(path, out_path):
+    with open(path, "r") as f: lines = f.readlines()
+    cleaned = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+    converted = [c for c in (legacy_convert_line(p) for p in cleaned) if c]
+    with open(out_path, "w") as f:
+        for proxy in converted: f.write(proxy + "\n")
+    return len(cleaned)
+
+def run_parser(path, out_path):
+    count = 0
+    with open(out_path, "w") as out:
+        for raw, url in proxy_parser.iter_proxy_urls(path):
+            count += 1
+            if url is not None: out.write(url + "\n")
+    return count
+
+def generate_input(path, n_lines):
+    rnd = random.Random(42)
+    with open(path, "w") as f:
+        for i in range(n_lines):
+            ip = f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}"
+            port = rnd.randint(1000, 65000)
+            kind = i % 4
+            if kind == 0: f.write(f"{ip}:{port}\n")
+            elif kind == 1: f.write(f"{ip}:{port}:user{i}:pass{i}\n")
+            elif kind == 2: f.write(f"user{i}:pass{i}@{ip}:{port}\n")
+            else: f.write(f"http://user{i}:pass{i}@{ip}:{port}\n")
+
+def child(mode, path):
+    out_path = path + f".{mode}.out"
+    start = time.perf_counter()
+    count = (run_legacy if mode == "legacy" else run_parser)(path, out_path)
+    elapsed = time.perf_counter() - start
+    os.remove(out_path)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # KB di Linux
+    print(f"{count} {elapsed:.4f} {peak_kb}")
+
+def main():
+    if len(sys.argv) >= 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3]); return
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LINES
+    fd, path = tempfile.mkstemp(suffix=".txt", prefix="proxylist_bench_")
+    os.close(fd)
+    try:
+        print(f"Membuat {n_lines:,} baris campuran di {path}...")
+        generate_input(path, n_lines)
+        print(f"{'Mode':<8} {'Baris':>10} {'Detik':>8} {'Baris/detik':>14} {'Peak RSS':>10}")
+        for mode in MODES:
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, path],
+                                    capture_output=True, text=True, check=True)
+            count, elapsed, peak_kb = result.stdout.split()
+            count, elapsed, peak_kb = int(count), float(elapsed), int(peak_kb)
+            print(f"{mode:<8} {count:>10,} {elapsed:>8.2f} {count / elapsed:>14,.0f} {peak_kb / 1024:>8.1f}MB")
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
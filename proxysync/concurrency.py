@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import ui # Mengimpor semua fungsi UI dari file ui.py
+
+try:
+    import resource # Tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+# --- Konfigurasi Path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONCURRENCY_LOG_FILE = os.path.join(SCRIPT_DIR, "concurrency_log.jsonl") # Log keputusan controller
+
+# --- Konfigurasi Controller (AIMD) ---
+MIN_WINDOW = 50             # Minimal hasil per jendela evaluasi (jendela kecil terlalu berisik)
+DECREASE_FACTOR = 0.5       # Multiplicative decrease saat terdeteksi tersendat
+TIMEOUT_RATE_TOLERANCE = 0.15 # Kenaikan timeout rate di atas baseline yang masih ditoleransi
+BASELINE_ALPHA = 0.2        # Bobot EWMA baseline timeout rate
+ERROR_RATE_LIMIT = 0.05     # Batas rasio error lokal/throttling provider per jendela
+LOOP_LAG_LIMIT = 0.5        # Detik; event loop telat lebih dari ini = CPU/loop kewalahan
+FD_PER_CHECK = 2            # Perkiraan file descriptor per cek yang berjalan
+FD_RESERVE = 64             # FD yang disisakan untuk file, log, DB, dll.
+
+# Penanda di reason yang berarti sisi LOKAL atau provider tersendat (bukan proxy mati biasa)
+CONGESTION_MARKERS = ("EMFILE", "ENFILE", "ENOBUFS", "EADDRNOTAVAIL", "ENOMEM",
+                      "ConnectionResetError", "Rate Limit", "429")
+
+def raise_fd_limit():
+    """Naikkan soft limit RLIMIT_NOFILE ke hard limit (jika memungkinkan)."""
+    if resource is None: return
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = hard if hard != resource.RLIM_INFINITY else 65536
+        if soft != resource.RLIM_INFINITY and soft < target:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ValueError, OSError):
+        pass
+
+def fd_concurrency_cap():
+    """Batas concurrency berdasarkan limit file descriptor. None = tidak diketahui/tak terbatas."""
+    if resource is None: return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY: return None
+    return max(1, (soft - FD_RESERVE) // FD_PER_CHECK)
+
+def classify_reason(is_good, reason):
+    """Kategori hasil untuk controller: 'ok', 'timeout', 'congestion', atau 'fail'."""
+    if is_good: return "ok"
+    if "Timeout" in reason: return "timeout"
+    if any(marker in reason for marker in CONGESTION_MARKERS): return "congestion"
+    return "fail"
+
+class AIMDController:
+    """Controller concurrency AIMD untuk tes proxy.
+
+    Tiap jendela (~satu putaran `limit` hasil) limit naik `step` selama hasil
+    bersih, dan turun DECREASE_FACTOR jika timeout rate naik di atas baseline,
+    error lokal/throttling melewati batas, atau event loop lag. Semua keputusan
+    ditulis ke CONCURRENCY_LOG_FILE (JSON per baris); file dikosongkan saat controller
+    dibuat, kecuali `append_log=True` (pass lanjutan dalam run yang sama).
+    """
+
+    def __init__(self, initial, minimum, maximum, step, engine="thread", log_file=CONCURRENCY_LOG_FILE, append_log=False):
+        raise_fd_limit()
+        cap = fd_concurrency_cap()
+        self.maximum = min(maximum, cap) if cap else maximum
+        self.minimum = min(minimum, self.maximum)
+        self.limit = max(self.minimum, min(initial, self.maximum))
+        self.initial = self.limit
+        self.step = step
+        self.engine = engine
+        self.log_file = log_file
+        self.baseline_timeout_rate = None
+        self.loop_lag = 0.0
+        self.adjustments = 0
+        self._reset_window()
+        if not append_log: self._truncate_log() # Log hanya berisi run terakhir, tidak tumbuh terus
+
+    def _truncate_log(self):
+        try:
+            with open(self.log_file, "w"): pass
+        except IOError:
+            pass # Log hanya untuk tuning, jangan ganggu tes
+
+    def _reset_window(self):
+        self.window = {"ok": 0, "timeout": 0, "congestion": 0, "fail": 0}
+        self.window_total = 0
+
+    def record(self, result):
+        """Catat satu hasil tes (proxy, ok, reason); evaluasi limit tiap jendela penuh."""
+        _, is_good, reason = result
+        self.window[classify_reason(is_good, reason)] += 1
+        self.window_total += 1
+        if self.window_total >= max(MIN_WINDOW, self.limit):
+            self._adjust()
+
+    def record_loop_lag(self, lag):
+        # Simpan lag terburuk sejak evaluasi terakhir
+        self.loop_lag = max(self.loop_lag, lag)
+
+    def _adjust(self):
+        total = self.window_total
+        timeout_rate = self.window["timeout"] / total
+        error_rate = self.window["congestion"] / total
+        # Baseline = timeout rate "alami" list ini (proxy mati), dibandingkan SEBELUM diperbarui
+        baseline = timeout_rate if self.baseline_timeout_rate is None else self.baseline_timeout_rate
+        self.baseline_timeout_rate = baseline * (1 - BASELINE_ALPHA) + timeout_rate * BASELINE_ALPHA
+
+        reasons = []
+        if timeout_rate > baseline + TIMEOUT_RATE_TOLERANCE: reasons.append("timeout_rate")
+        if error_rate > ERROR_RATE_LIMIT: reasons.append("error_rate")
+        if self.loop_lag > LOOP_LAG_LIMIT: reasons.append("loop_lag")
+
+        old_limit = self.limit
+        if reasons:
+            self.limit = max(self.minimum, int(self.limit * DECREASE_FACTOR))
+            action = "decrease"
+        else:
+            self.limit = min(self.maximum, self.limit + self.step)
+            action = "increase"
+        if self.limit != old_limit: self.adjustments += 1
+
+        self._log({
+            "ts": round(time.time(), 3), "engine": self.engine, "action": action,
+            "limit_from": old_limit, "limit_to": self.limit, "window": total,
+            "timeout_rate": round(timeout_rate, 3), "error_rate": round(error_rate, 3),
+            "baseline_timeout_rate": round(self.baseline_timeout_rate, 3),
+            "loop_lag_ms": round(self.loop_lag * 1000, 1), "reasons": reasons,
+        })
+        self.loop_lag = 0.0
+        self._reset_window()
+
+    def _log(self, entry):
+        try:
+            with open(self.log_file, "a") as f: f.write(json.dumps(entry) + "\n")
+        except IOError:
+            pass # Log hanya untuk tuning, jangan ganggu tes
+
+    def print_summary(self):
+        ui.console.print(f"[dim]Concurrency adaptif ({self.engine}): awal {self.initial} -> akhir {self.limit} "
+                         f"(min {self.minimum}, max {self.maximum}), {self.adjustments} penyesuaian. "
+                         f"Log: '{os.path.basename(self.log_file)}'[/dim]")
@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+import threading
+
+# --- Konfigurasi Path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DOWNLOAD_CACHE_DIR = os.path.join(SCRIPT_DIR, "download_cache") # Isi terakhir tiap URL + validator
+DOWNLOAD_STATE_FILE = os.path.join(DOWNLOAD_CACHE_DIR, "state.json")
+
+def content_digest(lines):
+    """Hash isi list (urutan baris diabaikan) untuk mendeteksi perubahan."""
+    return hashlib.sha256("\n".join(sorted(lines)).encode()).hexdigest()
+
+class DownloadCache:
+    """Validator (ETag/Last-Modified) + hash isi terakhir per URL download, untuk GET kondisional.
+
+    Dipakai bersama oleh thread download (thread-safe). Panggil save() setelah semua selesai.
+    """
+
+    def __init__(self, cache_dir=DOWNLOAD_CACHE_DIR, state_file=DOWNLOAD_STATE_FILE):
+        self.cache_dir = cache_dir
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.unchanged_urls = set() # URL yang isinya sama dengan download sebelumnya (run ini)
+        try:
+            with open(state_file, "r") as f: saved = json.load(f)
+        except (IOError, ValueError):
+            saved = {}
+        self.state = saved.get("urls", {})
+        self.combined_sha256 = saved.get("combined_sha256") # Hash gabungan unik download terakhir
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest()[:24] + ".txt")
+
+    def conditional_headers(self, url):
+        """Header If-None-Match / If-Modified-Since (hanya jika isi lama masih tersimpan)."""
+        with self.lock:
+            entry = self.state.get(url)
+        if not entry or not os.path.exists(self._body_path(url)): return {}
+        headers = {}
+        if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def cached_lines(self, url):
+        """Isi terakhir URL (untuk respons 304), atau None jika tidak ada."""
+        try:
+            with open(self._body_path(url), "r") as f: return f.read().splitlines()
+        except IOError:
+            return None
+
+    def mark_unchanged(self, url):
+        with self.lock: self.unchanged_urls.add(url)
+
+    def store(self, url, response_headers, lines):
+        """Simpan isi & validator baru. Return True jika isi berbeda dari download sebelumnya."""
+        digest = content_digest(lines)
+        with self.lock:
+            previous = self.state.get(url, {})
+            changed = previous.get("sha256") != digest
+            self.state[url] = {
+                "sha256": digest,
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+            }
+            if not changed: self.unchanged_urls.add(url)
+        if changed or not os.path.exists(self._body_path(url)):
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(self._body_path(url), "w") as f: f.write("\n".join(lines))
+            except IOError:
+                pass # Tanpa isi tersimpan, conditional_headers() tidak dikirim lagi
+        return changed
+
+    def update_combined(self, lines):
+        """Catat hash gabungan semua download. Return True jika berbeda dari run sebelumnya."""
+        digest = content_digest(lines)
+        changed = digest != self.combined_sha256
+        self.combined_sha256 = digest
+        return changed
+
+    def save(self, active_urls=None):
+        """Tulis state ke disk; entry URL yang tidak lagi dipakai dibuang jika `active_urls` diberikan."""
+        with self.lock:
+            if active_urls is not None:
+                for url in [u for u in self.state if u not in active_urls]:
+                    del self.state[url]
+                    try: os.remove(self._body_path(url))
+                    except OSError: pass
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = self.state_file + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"combined_sha256": self.combined_sha256, "urls": self.state}, f, indent=1)
+                os.replace(tmp_path, self.state_file)
+            except OSError:
+                pass
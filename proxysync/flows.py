@@ -1,12 +1,21 @@
 import os
 import time
-import requests
+import shutil
+import threading
 import ui # Mengimpor semua fungsi UI dari file ui.py
 
 # Import dari modul lain
 import webshare
 import utils
 import tester
+import async_tester
+import proxydb
+import concurrency
+import download_cache
+import pipeline
+import proxy_parser
+import scheduler
+import journal
 
 # --- Konfigurasi Path (dibutuhkan untuk file I/O) ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -18,12 +27,48 @@ APILIST_SOURCE_FILE = os.path.join(CONFIG_DIR, "apilist.txt")     # Daftar URL d
 WEBSHARE_APIKEYS_FILE = os.path.join(CONFIG_DIR, "apikeys.txt")   # API Keys Webshare
 FAIL_PROXY_FILE = os.path.join(SCRIPT_DIR, "fail_proxy.txt")       # Output proxy gagal
 SUCCESS_PROXY_FILE = os.path.join(SCRIPT_DIR, "success_proxy.txt") # Output proxy sukses
+SUCCESS_SCORES_FILE = os.path.join(SCRIPT_DIR, "success_proxy_scores.csv") # Sidecar skor latency
+UNTESTED_PROXY_FILE = os.path.join(SCRIPT_DIR, "untested_proxy.txt") # Sisa proxy saat tes berhenti lebih awal (--want)
+TESTED_INPUT_FILE = os.path.join(SCRIPT_DIR, "last_tested_input.txt") # Snapshot input tes terakhir (untuk tes diff)
+SHORT_CIRCUIT_FILE = os.path.join(SCRIPT_DIR, "short_circuited_groups.txt") # Grup subnet/gateway yang dilewati scheduler
 
 # --- Konfigurasi Tes Proxy ---
+# Concurrency adaptif (AIMD): nilai MAX_WORKERS/ASYNC_MAX_CONCURRENCY jadi titik awal,
+# controller menaikkan s/d *_CEILING selama hasil bersih dan mundur saat tersendat.
+ADAPTIVE_CONCURRENCY = True
 MAX_WORKERS = 10
+THREAD_MIN_WORKERS, THREAD_MAX_WORKERS_CEILING, THREAD_STEP = 2, 64, 2
+ASYNC_MAX_CONCURRENCY = 500 # Dipakai jika engine='async'
+ASYNC_MIN_CONCURRENCY, ASYNC_CONCURRENCY_CEILING, ASYNC_STEP = 20, 4000, 50
+VERDICT_TTL_SECONDS = 6 * 3600 # Mode incremental: verdict lebih muda dari ini dipakai ulang
+# Tes diff: proxy yang sudah ada di input tes terakhir memakai verdict lamanya (maks. umur di bawah);
+# hanya proxy baru yang dites. Input identik (IP publik & profil tes sama) = tes dilewati sama sekali.
+DIFF_ONLY_TESTING = True
+DIFF_VERDICT_MAX_AGE = 3 * 24 * 3600
+# Exit IP (dari ipify, mode auto): True = dari proxy lolos yang keluar lewat IP sama, hanya yang tercepat disimpan
+COLLAPSE_BY_EXIT_IP = False
+# Scheduler subnet: perwakilan tiap /24 atau host gateway dites dulu; grup yang mati total hanya disampel
+SUBNET_SCHEDULING = True
+SUBNET_SCHEDULING_MIN_PROXIES = 50 # List lebih kecil dari ini dites apa adanya
+# Karantina: proxy yang gagal keras beruntun (per IP publik & profil tes) tidak dites ulang sampai
+# backoff eksponensial habis (proxydb.quarantine_backoff). Dimatikan oleh --full-retest.
+QUARANTINE_ENABLED = True
+# Journal verdict: tiap hasil tes ditulis append-only ke journal.JOURNAL_FILE. True = lanjutkan
+# run yang terputus (hash input & profil tes sama) tanpa mengetes ulang proxy yang sudah punya verdict.
+RESUME_INTERRUPTED = False
+# Timeout cek IP publik (ipify) saat verdict cache dipakai tanpa sync Webshare di run yang sama
+PUBLIC_IP_LOOKUP_TIMEOUT = 10
+# Maks. cek paralel ke satu host proxy (mis. gateway Webshare), host dilayani round-robin. 0 = tanpa batas
+PER_HOST_CONCURRENCY = 8
 
-def download_proxies_from_api(is_auto=False, get_urls_only=False):
-    ui.print_header()
+def download_proxies_from_api(is_auto=False, get_urls_only=False, on_list=None):
+    """Discover URL (dari API keys) lalu unduh semua proxy list ke PROXYLIST_SOURCE_FILE.
+
+    Dengan `on_list(lines)`, tiap list diteruskan begitu selesai diunduh (pipeline streaming);
+    header & progress bar tidak ditampilkan dan PROXYLIST_SOURCE_FILE selalu ditulis sebagai checkpoint.
+    """
+    streaming = on_list is not None
+    if not streaming: ui.print_header()
     if get_urls_only:
         ui.console.print("[bold cyan]--- Discover & Simpan URL Download Proxy ---[/bold cyan]")
     else:
@@ -47,16 +92,11 @@ def download_proxies_from_api(is_auto=False, get_urls_only=False):
             ui.console.print(f"Ditemukan {len(api_keys)} API Key untuk dicek.")
             processed_keys_count = 0
             for api_key in api_keys:
-                account_email_info = "[grey]Mencoba mendapatkan email...[/]"
-                try:
-                    with requests.Session() as email_session:
-                        email_session.headers.update({"Authorization": f"Token {api_key}", "Accept": "application/json"})
-                        account_email_info = webshare.get_account_email(email_session)
-                except Exception: account_email_info = "[bold red]Error[/]"
-                ui.console.print(f"\n--- Mengecek Key: [...{api_key[-6:]}] (Email: {account_email_info}) ---")
-
-                with requests.Session() as session:
-                    session.headers.update({"Authorization": f"Token {api_key}", "Accept": "application/json"})
+                with webshare.create_webshare_session(api_key) as session: # Satu session + cache metadata per akun
+                    try: account_email_info = webshare.get_account_email(session)
+                    except Exception: account_email_info = "[bold red]Error[/]"
+                    ui.console.print(f"\n--- Mengecek Key: [...{api_key[-6:]}] (Email: {account_email_info}) ---")
+
                     try:
                         plan_id = webshare.get_target_plan_id(session)
                         if not plan_id:
@@ -80,7 +120,8 @@ def download_proxies_from_api(is_auto=False, get_urls_only=False):
                         ui.console.print(f"   -> [bold red]!!! TERJADI ERROR saat discover URL: {e}[/bold red]")
                         discovery_failed = True
                 processed_keys_count += 1
-                if processed_keys_count < len(api_keys):
+                # Jeda antar akun hanya jika akun ini memanggil API (metadata dari cache = tanpa request)
+                if session.api_calls and processed_keys_count < len(api_keys):
                      time.sleep(1)
 
             ui.console.print(f"\nSelesai discover URL dari API keys. {len(discovered_urls_from_keys)} URL ditemukan.")
@@ -109,22 +150,35 @@ def download_proxies_from_api(is_auto=False, get_urls_only=False):
         choice = ui.Prompt.ask(f"[bold yellow]File '{os.path.basename(PROXYLIST_SOURCE_FILE)}' sudah ada isinya. Hapus dan timpa? (y/n)[/bold yellow]", choices=["y", "n"], default="y").lower()
         if choice == 'n': ui.console.print("[cyan]Operasi unduh dibatalkan.[/cyan]"); return False
     try:
+        # Cek bisa ditulis tanpa mengosongkan: file tidak disentuh jika download tidak berubah
         os.makedirs(os.path.dirname(PROXYLIST_SOURCE_FILE), exist_ok=True)
-        with open(PROXYLIST_SOURCE_FILE, "w") as f: pass
+        with open(PROXYLIST_SOURCE_FILE, "a") as f: pass
         ui.console.print(f"\n[green]File '{os.path.basename(PROXYLIST_SOURCE_FILE)}' siap diisi.[/green]")
-    except IOError as e: ui.console.print(f"[bold red]Gagal mengosongkan '{PROXYLIST_SOURCE_FILE}': {e}[/bold red]"); return False
+    except IOError as e: ui.console.print(f"[bold red]Gagal membuka '{PROXYLIST_SOURCE_FILE}': {e}[/bold red]"); return False
 
     download_targets_final = [(url, None) for url in urls_to_process]
     ui.console.print(f"\n[bold cyan]Siap mengunduh dari {len(download_targets_final)} URL...[/bold cyan]")
 
-    all_downloaded_proxies = ui.run_sequential_api_downloads(download_targets_final)
+    cache = download_cache.DownloadCache()
+    all_downloaded_proxies = ui.run_parallel_api_downloads(
+        download_targets_final, cache=cache, show_progress=not streaming,
+        on_result=(lambda url, lines: on_list(lines)) if streaming else None,
+    )
     if not all_downloaded_proxies:
+        cache.save(active_urls=urls_to_process)
         ui.console.print("\n[bold yellow]Tidak ada proxy yang berhasil diunduh.[/bold yellow]")
         return False
 
     try:
-        unique_proxies = sorted(list(set(all_downloaded_proxies)))
+        unique_proxies = sorted(proxy_parser.dedupe(all_downloaded_proxies)) # Dedupe kanonik lintas format
         duplicates_removed = len(all_downloaded_proxies) - len(unique_proxies)
+        content_changed = cache.update_combined(unique_proxies)
+        cache.save(active_urls=urls_to_process)
+        if not content_changed and is_auto and not streaming and os.path.exists(PROXY_SOURCE_FILE):
+            # Sama dengan download terakhir yang sudah dikonversi ke proxy.txt: proxylist.txt tidak
+            # diisi ulang sehingga konversi (skip_if_unchanged) & tes diff bisa dilewati
+            ui.console.print(f"\n[bold green]✅ {len(unique_proxies)} proxy unik, sama dengan download terakhir.[/bold green]")
+            return True
         with open(PROXYLIST_SOURCE_FILE, "w") as f:
             for proxy in unique_proxies: f.write(proxy + "\n")
         ui.console.print(f"\n[bold green]✅ {len(unique_proxies)} proxy unik berhasil diunduh dan disimpan ke '{os.path.basename(PROXYLIST_SOURCE_FILE)}'[/bold green]")
@@ -134,8 +188,376 @@ def download_proxies_from_api(is_auto=False, get_urls_only=False):
         ui.console.print(f"\n[bold red]Gagal menulis hasil ke '{PROXYLIST_SOURCE_FILE}': {e}[/bold red]")
         return False
 
+def current_public_ip():
+    """IP publik untuk kunci verdict cache & karantina: hasil sync Webshare run ini, atau dicek sekarang.
+
+    Hanya dipanggil jika verdict/karantina memang akan dipakai (cek ipify, maks. PUBLIC_IP_LOOKUP_TIMEOUT).
+    """
+    return webshare.LAST_PUBLIC_IP or webshare.get_current_public_ip(log=lambda *args, **kwargs: None, timeout=PUBLIC_IP_LOOKUP_TIMEOUT)
+
+def current_test_profile(is_auto):
+    targets = [tester.IP_TEST_TARGET] if is_auto else [url for _, url in tester.GITHUB_TEST_TARGETS]
+    return journal.test_profile(is_auto, tester.PRESCREEN_ENABLED, targets)
+
+def split_fresh_verdicts(health_db, proxies, ttl, unchanged=None, unchanged_ttl=DIFF_VERDICT_MAX_AGE, public_ip=None, profile=None):
+    """Pisahkan proxy: (perlu_dites, reuse_lolos, reuse_gagal) berdasarkan verdict < ttl detik.
+
+    `ttl=None` = tidak ada reuse berbasis TTL. Proxy di `unchanged` (sudah ada di input
+    tes sebelumnya) memakai verdict hingga `unchanged_ttl` detik. Dengan `public_ip` &
+    `profile`, hanya verdict dari IP publik & profil tes yang sama yang dipakai.
+    """
+    fresh = health_db.fresh_verdicts(proxies, ttl, public_ip, profile) if ttl is not None else {}
+    if unchanged:
+        fresh.update(health_db.fresh_verdicts([p for p in proxies if p in unchanged and p not in fresh], unchanged_ttl, public_ip, profile))
+    to_test = [p for p in proxies if p not in fresh]
+    reused_good = [p for p in proxies if p in fresh and fresh[p]["last_ok"]]
+    reused_failed = [(p, fresh[p]["last_reason"]) for p in proxies if p in fresh and not fresh[p]["last_ok"]]
+    return to_test, reused_good, reused_failed
+
+def split_quarantined(health_db, proxies, public_ip, profile):
+    """Pisahkan proxy: (perlu_dites, [(proxy, alasan)] yang masih dikarantina)."""
+    quarantined = health_db.quarantined(proxies, public_ip, profile)
+    now = time.time()
+    to_test = [p for p in proxies if p not in quarantined]
+    skipped = []
+    for p in proxies:
+        if p not in quarantined: continue
+        row, until = quarantined[p]
+        skipped.append((p, f"Karantina ({row['consecutive_failures']}x gagal, tes lagi dalam {(until - now) / 3600:.1f} jam): {row['last_reason']}"))
+    return to_test, skipped
+
+def score_good_proxies(good_proxies, timings_by_proxy, health_db=None, exit_ip_by_proxy=None):
+    """Hitung skor latency tiap proxy yang lolos. Return list dict, urut dari skor terbaik."""
+    exit_ip_by_proxy = exit_ip_by_proxy or {}
+    rows = health_db.get_many(good_proxies) if health_db is not None else {}
+    score_rows = []
+    for p in good_proxies:
+        timings = timings_by_proxy.get(p, {})
+        row = rows.get(p)
+        # Proxy dari verdict reuse (incremental) tidak punya timing baru, pakai latency terakhir di DB
+        latency = timings.get("total", row["last_latency"] if row is not None else None)
+        success_rate = row["success_rate"] if row is not None else 1.0
+        score_rows.append({
+            "proxy": p,
+            "score": proxydb.latency_score(latency, success_rate),
+            "latency_ms": latency,
+            "connect_ms": timings.get("connect"),
+            "tunnel_ms": timings.get("tunnel"),
+            "tls_ms": timings.get("tls"),
+            "ttfb_ms": timings.get("ttfb"),
+            "success_rate": round(success_rate, 3),
+            # Exit IP tes ini, atau yang tersimpan di DB untuk verdict reuse
+            "exit_ip": exit_ip_by_proxy.get(p) or (row["exit_ip"] if row is not None else None),
+        })
+    score_rows.sort(key=lambda row: row["score"])
+    return score_rows
+
+def collapse_by_exit_ip(score_rows):
+    """Satu proxy per exit IP: `score_rows` sudah urut skor, jadi kemunculan pertama = tercepat.
+    Proxy tanpa exit IP (mis. tes GitHub) selalu dipertahankan. Return (rows, jumlah dibuang)."""
+    seen_ips, kept = set(), []
+    for row in score_rows:
+        exit_ip = row.get("exit_ip")
+        if exit_ip:
+            if exit_ip in seen_ips: continue
+            seen_ips.add(exit_ip)
+        kept.append(row)
+    return kept, len(score_rows) - len(kept)
+
+def report_exit_ips(score_rows, top=5):
+    """Tampilkan jumlah exit IP berbeda di antara proxy lolos + IP yang paling banyak dipakai bersama."""
+    counts = {}
+    for row in score_rows:
+        if row.get("exit_ip"): counts[row["exit_ip"]] = counts.get(row["exit_ip"], 0) + 1
+    if not counts: return
+    known = sum(counts.values())
+    ui.console.print(f"[cyan]Exit IP: {len(counts)} IP berbeda dari {known} proksi lolos (exit IP diketahui).[/cyan]")
+    shared = sorted(((n, ip) for ip, n in counts.items() if n > 1), reverse=True)
+    for n, ip in shared[:top]:
+        ui.console.print(f"[dim]   {ip}: dipakai {n} proksi[/dim]")
+
+def resolve_want(want, total):
+    """Ubah opsi --want ('300' atau '25%') jadi jumlah target proxy lolos. None = tes semua."""
+    if want is None: return None
+    want = str(want).strip()
+    if want.endswith("%"):
+        return max(1, int(total * float(want[:-1]) / 100))
+    return max(1, int(want))
+
+def merge_fail_file(src, dst, append):
+    """Pindahkan isi `src` (fail file tes tambahan) ke `dst`; append=False menimpa `dst`."""
+    if not os.path.exists(src): return
+    try:
+        with open(src) as fin, open(dst, "a" if append else "w") as fout: shutil.copyfileobj(fin, fout)
+        os.remove(src)
+    except (IOError, OSError) as e:
+        ui.console.print(f"[yellow]Gagal menggabungkan '{os.path.basename(src)}' ke '{os.path.basename(dst)}': {e}[/yellow]")
+
+def save_untested_proxies(untested, file_path):
+    """Simpan proxy yang tidak sempat dites (bukan gagal); hapus file lama jika tidak ada sisa.
+
+    `untested` boleh berupa generator: ditulis sambil dibaca, tidak ditampung di memori.
+    """
+    try:
+        count, f = 0, None
+        try:
+            for p in untested:
+                if f is None: f = open(file_path, "w")
+                f.write(p + "\n")
+                count += 1
+        finally:
+            if f is not None: f.close()
+        if count:
+            ui.console.print(f"[dim]   {count} proksi belum punya verdict (target tercapai / rate limit) -> '{os.path.basename(file_path)}'[/dim]")
+        elif os.path.exists(file_path):
+            os.remove(file_path)
+    except (IOError, OSError) as e:
+        ui.console.print(f"[yellow]Gagal memperbarui '{os.path.basename(file_path)}': {e}[/yellow]")
+
+def save_short_circuited_groups(subnet_scheduler, file_path, top=5):
+    """Tampilkan & simpan grup yang di-short-circuit scheduler; hapus file lama jika tidak ada."""
+    rows = subnet_scheduler.summary_rows()
+    try:
+        if rows:
+            skipped = sum(row[1] for row in rows)
+            ui.console.print(f"[cyan]Scheduler subnet: {len(rows)} grup mati, {skipped} proksi tidak dites.[/cyan]")
+            for key, group_skipped, tested, _ in rows[:top]:
+                ui.console.print(f"[dim]   {key}: {tested} dites gagal keras, {group_skipped} dilewati[/dim]")
+            with open(file_path, "w") as f:
+                f.write("# grup\tdilewati\tdites\tlolos\n")
+                for row in rows: f.write("\t".join(str(v) for v in row) + "\n")
+        elif os.path.exists(file_path):
+            os.remove(file_path)
+    except (IOError, OSError) as e:
+        ui.console.print(f"[yellow]Gagal memperbarui '{os.path.basename(file_path)}': {e}[/yellow]")
+
+def create_concurrency_controller(engine="thread", append_log=False):
+    """Controller AIMD untuk engine terpilih, atau None jika ADAPTIVE_CONCURRENCY mati."""
+    if not ADAPTIVE_CONCURRENCY: return None
+    if engine == "async":
+        return concurrency.AIMDController(ASYNC_MAX_CONCURRENCY, ASYNC_MIN_CONCURRENCY, ASYNC_CONCURRENCY_CEILING, ASYNC_STEP, engine="async", append_log=append_log)
+    return concurrency.AIMDController(MAX_WORKERS, THREAD_MIN_WORKERS, THREAD_MAX_WORKERS_CEILING, THREAD_STEP, engine="thread", append_log=append_log)
+
+def run_proxy_tests(proxies, is_auto=False, engine="thread", incremental=False, ttl=VERDICT_TTL_SECONDS, want=None, unchanged=None):
+    """Tes list proxy dengan engine terpilih, catat hasil ke health DB.
+
+    Dengan `incremental=True`, proxy yang verdict terakhirnya lebih muda dari
+    `ttl` detik tidak dites ulang; verdict lamanya dipakai.
+    `unchanged` (set) = proxy yang sudah ada di input tes sebelumnya; verdictnya
+    dipakai ulang hingga DIFF_VERDICT_MAX_AGE sehingga hanya proxy baru yang dites.
+    Verdict yang dipakai ulang harus berasal dari IP publik & profil tes yang sama.
+    Dengan `want` ('300' atau '25%'), proxy dites urut prioritas dan tes berhenti
+    begitu target lolos tercapai; sisanya dicatat sebagai untested, bukan gagal.
+    Return list proxy yang lolos, diurutkan dari skor latency terbaik
+    (detail skor ditulis ke SUCCESS_SCORES_FILE).
+    """
+    health_db = proxydb.open_health_db()
+    streaming = isinstance(proxies, pipeline.ProxyStream)
+    if streaming and (incremental or unchanged or (want and str(want).strip().endswith("%"))):
+        # Daftar lengkap belum ada saat tes dimulai: reuse verdict & target persen tidak bisa dihitung
+        ui.console.print("[yellow]Mode streaming: incremental/diff dan --want persen dilewati.[/yellow]")
+        incremental, unchanged = False, None
+        if want and str(want).strip().endswith("%"): want = None
+    profile = current_test_profile(is_auto)
+    # Verdict & karantina hanya berlaku untuk IP publik saat ini (otorisasi IP Webshare): kunci keduanya.
+    # IP dicek hanya jika salah satunya akan dipakai; jika tidak diketahui, hasil tidak masuk cache/karantina.
+    public_ip = webshare.LAST_PUBLIC_IP
+    use_quarantine = QUARANTINE_ENABLED and not streaming
+    if health_db is not None and public_ip is None and (incremental or unchanged or use_quarantine):
+        public_ip = current_public_ip()
+        if public_ip is None:
+            ui.console.print("[yellow]IP publik tidak diketahui: verdict cache & karantina tidak dipakai (tes penuh).[/yellow]")
+            incremental, unchanged = False, None
+    verdict_journal, resumed = None, {}
+    if not streaming:
+        # Journal crash-safe: verdict ditulis saat datang, bukan hanya di akhir (tidak untuk streaming:
+        # hash input belum diketahui saat tes dimulai)
+        try:
+            verdict_journal = journal.VerdictJournal()
+            resumed = verdict_journal.open_for_run(journal.input_hash(proxies), profile, resume=RESUME_INTERRUPTED)
+        except (IOError, OSError) as e:
+            ui.console.print(f"[yellow]Journal verdict tidak bisa ditulis ({e}); tes tetap jalan tanpa checkpoint.[/yellow]")
+            verdict_journal, resumed = None, {}
+        if resumed:
+            proxies = [p for p in proxies if p not in resumed]
+            ui.console.print(f"[cyan]Resume: {len(resumed)} verdict dari run yang terputus dipakai, {len(proxies)} proksi tersisa.[/cyan]")
+        elif RESUME_INTERRUPTED:
+            ui.console.print("[dim]Resume: tidak ada run terputus dengan input & profil tes yang sama, tes dari awal.[/dim]")
+    try:
+        reused_good, reused_failed = [], []
+        if (incremental or unchanged) and health_db is not None:
+            # --incremental: verdict lebih tua dari TTL selalu dites ulang, juga untuk input yang tidak berubah
+            unchanged_ttl = min(ttl, DIFF_VERDICT_MAX_AGE) if incremental else DIFF_VERDICT_MAX_AGE
+            proxies, reused_good, reused_failed = split_fresh_verdicts(health_db, proxies, ttl if incremental else None, unchanged, unchanged_ttl, public_ip=public_ip, profile=profile)
+            mode_label = f"Mode incremental (TTL {ttl}s)" if incremental else "Mode diff"
+            ui.console.print(f"[cyan]{mode_label}: {len(reused_good) + len(reused_failed)} verdict dipakai ulang "
+                             f"({len(reused_good)} lolos, {len(reused_failed)} gagal), {len(proxies)} proksi dites ulang.[/cyan]")
+        elif incremental or unchanged:
+            ui.console.print("[yellow]Health DB tidak tersedia, mode incremental/diff dilewati (tes penuh).[/yellow]")
+        quarantined = []
+        if use_quarantine and health_db is not None and public_ip is not None:
+            proxies, quarantined = split_quarantined(health_db, proxies, public_ip, profile)
+            if quarantined:
+                ui.console.print(f"[cyan]Karantina: {len(quarantined)} proksi yang gagal beruntun dilewati (backoff belum habis, --full-retest untuk tes semua).[/cyan]")
+
+        timings_by_proxy, exit_ip_by_proxy = {}, {}
+        for p, entry in resumed.items():
+            if entry["ok"]:
+                reused_good.append(p)
+                if entry.get("ms") is not None: timings_by_proxy[p] = {"total": entry["ms"]}
+                if entry.get("ip"): exit_ip_by_proxy[p] = entry["ip"]
+            else:
+                reused_failed.append((p, entry.get("r", "")))
+
+        stop_after = resolve_want(want, len(proxies) + len(reused_good) + len(reused_failed) + len(quarantined))
+        if stop_after is not None:
+            stop_after -= len(reused_good) # Verdict reuse yang lolos ikut dihitung
+            if health_db is not None and not streaming: proxies = health_db.prioritize_for_testing(proxies)
+            ui.console.print(f"[cyan]Mode target: berhenti setelah {max(stop_after, 0)} proksi baru lolos.[/cyan]")
+
+        def handle_short_circuit(proxy):
+            # Anggota subnet mati yang dilewati tetap dapat verdict gagal (DB, journal, fail_proxy.txt):
+            # bukan untested, dan run berikutnya dengan input sama memakai ulang verdict ini
+            reason = scheduler.SHORT_CIRCUIT_REASON
+            if tested is not None: tested.add(proxy)
+            reused_failed.append((proxy, reason))
+            if health_db is not None: health_db.record_result(proxy, False, reason, public_ip=public_ip, profile=profile)
+            if verdict_journal is not None: verdict_journal.record(proxy, False, reason)
+
+        test_input, subnet_scheduler = proxies, None
+        # Dengan --want urutan prioritize_for_testing yang menentukan; round-robin subnet akan mengacaknya
+        if SUBNET_SCHEDULING and not streaming and stop_after is None and len(proxies) >= SUBNET_SCHEDULING_MIN_PROXIES:
+            subnet_scheduler = test_input = scheduler.SubnetScheduler(proxies, on_short_circuit=handle_short_circuit)
+
+        # Tanpa --want semua proxy dapat verdict (anggota subnet mati lewat handle_short_circuit): yang belum
+        # hanya yang kena rate limit. Dengan --want, proxy yang belum dites dibaca dari health DB di akhir
+        # (last_checked sebelum run ini); set proxy yang sudah dites hanya dipakai jika DB tidak tersedia
+        run_started = time.time()
+        tested = set() if stop_after is not None and health_db is None else None
+        rate_limited, counts = [], {"failed": 0}
+        def handle_result(result):
+            proxy, is_good, message = result
+            if subnet_scheduler is not None: subnet_scheduler.record(result)
+            if getattr(result, "rate_limited", False): # Bukan verdict proxy: tetap untested, tidak dicatat ke DB
+                if stop_after is None: rate_limited.append(proxy)
+                return
+            if tested is not None: tested.add(proxy)
+            if not is_good: counts["failed"] += 1
+            timings = getattr(result, "timings", {})
+            exit_ip = getattr(result, "exit_ip", None)
+            if is_good:
+                timings_by_proxy[proxy] = timings
+                if exit_ip: exit_ip_by_proxy[proxy] = exit_ip
+            if health_db is not None: health_db.record_result(proxy, is_good, message, latency=timings.get("total"), exit_ip=exit_ip, public_ip=public_ip, profile=profile)
+            if verdict_journal is not None: verdict_journal.record(proxy, is_good, message, latency=timings.get("total"), exit_ip=exit_ip)
+
+        def run_checks(test_input, fail_file, append_log=False):
+            controller = create_concurrency_controller(engine, append_log=append_log)
+            tester.TIMEOUTS.reset()
+            if engine == "async":
+                check_func_async = lambda p: async_tester.check_proxy_final_async(p, is_auto=is_auto)
+                good = ui.run_async_checks_display(test_input, check_func_async, ASYNC_MAX_CONCURRENCY, fail_file, on_result=handle_result, stop_after=stop_after, controller=controller, host_limit=PER_HOST_CONCURRENCY)
+            else:
+                check_func = lambda p: tester.check_proxy_final(p, is_auto=is_auto)
+                good = ui.run_concurrent_checks_display(test_input, check_func, MAX_WORKERS, fail_file, on_result=handle_result, stop_after=stop_after, controller=controller, host_limit=PER_HOST_CONCURRENCY)
+            if tester.ADAPTIVE_TIMEOUTS:
+                ui.console.print(f"[dim]Timeout adaptif akhir: {tester.TIMEOUTS.describe()}[/dim]")
+            if not is_auto and len(tester.GITHUB_TOKENS):
+                ui.console.print(f"[dim]Token GitHub: {tester.GITHUB_TOKENS.describe()}[/dim]")
+            return good
+
+        good_proxies = []
+        if (streaming or proxies) and (stop_after is None or stop_after > 0):
+            good_proxies = run_checks(test_input, FAIL_PROXY_FILE)
+        if streaming:
+            proxies.wait_closed() # Tunggu download selesai agar daftar input lengkap
+            proxies = list(proxies.items)
+        if subnet_scheduler is not None:
+            save_short_circuited_groups(subnet_scheduler, SHORT_CIRCUIT_FILE)
+            subnet_scheduler = None # Hasil tes ulang karantina di bawah bukan bagian dari urutan subnet
+        if quarantined and not good_proxies and not reused_good and (stop_after is None or stop_after > 0):
+            # Karantina saja tidak boleh mengosongkan success_proxy.txt: tidak ada yang lolos -> tes ulang
+            ui.console.print(f"[yellow]Tidak ada proksi yang lolos; {len(quarantined)} proksi karantina dites ulang.[/yellow]")
+            retest, first_pass_failed = [p for p, _ in quarantined], counts["failed"]
+            retest_fail_file = FAIL_PROXY_FILE + ".retest"
+            good_proxies = run_checks(retest, retest_fail_file, append_log=True)
+            merge_fail_file(retest_fail_file, FAIL_PROXY_FILE, append=bool(first_pass_failed))
+            proxies, quarantined = proxies + retest, []
+        reused_failed.extend(quarantined)
+        if stop_after is None: untested = rate_limited
+        elif health_db is not None:
+            health_db.flush()
+            untested = health_db.unchecked_since(proxies, run_started)
+        else: untested = (p for p in proxies if p not in tested)
+        save_untested_proxies(untested, UNTESTED_PROXY_FILE)
+
+        if reused_failed:
+            # Lengkapi fail_proxy.txt dengan proxy gagal yang tidak dites ulang
+            # (append hanya jika display barusan menulis file ini dengan hasil tes baru)
+            mode = "a" if counts["failed"] else "w"
+            try:
+                with open(FAIL_PROXY_FILE, mode) as f:
+                    for p, _ in reused_failed: f.write(p + "\n")
+            except IOError as e:
+                ui.console.print(f"[yellow]Gagal menulis '{os.path.basename(FAIL_PROXY_FILE)}': {e}[/yellow]")
+
+        if health_db is not None: health_db.flush()
+
+        score_rows = score_good_proxies(good_proxies + reused_good, timings_by_proxy, health_db, exit_ip_by_proxy)
+        report_exit_ips(score_rows)
+        if COLLAPSE_BY_EXIT_IP:
+            score_rows, collapsed = collapse_by_exit_ip(score_rows)
+            if collapsed: ui.console.print(f"[cyan]{collapsed} proksi dibuang (exit IP sama dengan proksi yang lebih cepat).[/cyan]")
+        if score_rows: utils.save_proxy_scores(score_rows, SUCCESS_SCORES_FILE)
+        if verdict_journal is not None: verdict_journal.finish()
+        return [row["proxy"] for row in score_rows]
+    finally:
+        if health_db is not None: health_db.close()
+        if verdict_journal is not None: verdict_journal.close() # Tanpa finish() = run terputus, bisa --resume
+
 # === PERBAIKAN: Terima flag is_auto ===
-def run_automated_test_and_save(is_auto=False):
+def load_tested_snapshot(file_path=TESTED_INPUT_FILE, max_age=DIFF_VERDICT_MAX_AGE):
+    """(set proxy input tes terakhir, {public_ip, profile} tes itu); kosong jika tidak ada atau lebih tua dari `max_age`."""
+    try:
+        if time.time() - os.path.getmtime(file_path) > max_age: return set(), {}
+        proxies, meta = set(), {}
+        with open(file_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("#"):
+                    meta.update(item.split("=", 1) for item in line[1:].split() if "=" in item)
+                elif line:
+                    proxies.add(line)
+        return proxies, meta
+    except (IOError, OSError):
+        return set(), {}
+
+def all_verdicts_fresh(proxies, ttl, public_ip, profile):
+    """True jika semua proxy punya verdict < `ttl` detik dari IP publik & profil tes yang sama."""
+    health_db = proxydb.open_health_db()
+    if health_db is None: return False
+    try:
+        return len(health_db.fresh_verdicts(proxies, ttl, public_ip, profile)) == len(proxies)
+    finally:
+        health_db.close()
+
+def has_untested_leftovers(file_path=UNTESTED_PROXY_FILE):
+    """True jika tes terakhir menyisakan proxy tanpa verdict (--want / rate limit)."""
+    try:
+        return os.path.getsize(file_path) > 0
+    except OSError:
+        return False
+
+def save_tested_snapshot(proxies, public_ip=None, profile=None, file_path=TESTED_INPUT_FILE):
+    """Simpan input tes + IP publik & profil tes (baris '#') agar tes hanya dilewati jika keduanya sama."""
+    try:
+        with open(file_path, "w") as f:
+            if public_ip and profile: f.write(f"# public_ip={public_ip} profile={profile}\n")
+            for p in proxies: f.write(p + "\n")
+    except IOError as e:
+        ui.console.print(f"[yellow]Gagal menyimpan snapshot input tes '{os.path.basename(file_path)}': {e}[/yellow]")
+
+def run_automated_test_and_save(is_auto=False, engine="thread", incremental=False, ttl=VERDICT_TTL_SECONDS, want=None):
     ui.print_header()
     ui.console.print("[bold cyan]Mode Auto: Tes Akurat & Simpan Hasil...[/bold cyan]")
     
@@ -159,6 +581,24 @@ def run_automated_test_and_save(is_auto=False):
             except OSError as e: ui.console.print(f"[yellow] Gagal menghapus '{os.path.basename(SUCCESS_PROXY_FILE)}': {e}[/yellow]")
         return False
     ui.console.print(f"Siap menguji {len(proxies)} proksi unik dari '{os.path.basename(PROXY_SOURCE_FILE)}'.")
+
+    unchanged = None
+    profile = current_test_profile(is_auto)
+    if DIFF_ONLY_TESTING:
+        previous, previous_meta = load_tested_snapshot()
+        if previous and previous == set(proxies) and os.path.exists(SUCCESS_PROXY_FILE) and not has_untested_leftovers():
+            # Hasil lama hanya berlaku untuk profil tes & IP publik yang sama (otorisasi IP Webshare)
+            public_ip = current_public_ip() if previous_meta.get("profile") == profile else None
+            if public_ip is None or previous_meta.get("public_ip") != public_ip:
+                ui.console.print("[cyan]Input sama dengan tes terakhir, tapi IP publik / profil tes berbeda: verdict lama tidak dipakai.[/cyan]")
+            elif not incremental or all_verdicts_fresh(proxies, ttl, public_ip, profile):
+                ui.console.print(f"[bold green]Input sama dengan tes terakhir; '{os.path.basename(SUCCESS_PROXY_FILE)}' dipakai apa adanya, tes dilewati.[/bold green]")
+                return True
+            else:
+                ui.console.print(f"[cyan]Input sama dengan tes terakhir, tapi ada verdict lebih tua dari TTL {ttl}s: tes ulang incremental.[/cyan]")
+        if previous:
+            unchanged = previous & set(proxies)
+            ui.console.print(f"[cyan]Diff input: +{len(proxies) - len(unchanged)} baru, -{len(previous) - len(unchanged)} hilang, {len(unchanged)} tetap.[/cyan]")
     ui.console.print("-" * 40)
     
     if is_auto:
@@ -166,10 +606,8 @@ def run_automated_test_and_save(is_auto=False):
     else:
         ui.console.print("[bold cyan]Langkah 2: Menjalankan Tes Akurat via GitHub API...[/bold cyan]")
     
-    # === PERBAIKAN: Buat lambda untuk ngirim flag is_auto ke tester ===
-    check_func_auto = lambda p: tester.check_proxy_final(p, is_auto=is_auto)
-    good_proxies = ui.run_concurrent_checks_display(proxies, check_func_auto, MAX_WORKERS, FAIL_PROXY_FILE) # Memanggil dari modul tester
-    # === AKHIR PERBAIKAN ===
+    good_proxies = run_proxy_tests(proxies, is_auto=is_auto, engine=engine, incremental=incremental, ttl=ttl, want=want, unchanged=unchanged)
+    save_tested_snapshot(proxies, webshare.LAST_PUBLIC_IP, profile)
     
     if not good_proxies:
         ui.console.print("[bold red]Berhenti: Tidak ada proksi yang lolos tes.[/bold red]")
@@ -187,3 +625,64 @@ def run_automated_test_and_save(is_auto=False):
     else:
         ui.console.print("\n[bold red]❌ Tes otomatis selesai, namun GAGAL menyimpan hasil.[/bold red]")
         return False
+
+def run_streaming_auto(is_auto=True, engine="thread", want=None):
+    """Full-auto versi streaming: download -> konversi -> dedupe -> tes berjalan tumpang tindih.
+
+    Proxy diteruskan ke tester begitu satu URL selesai diunduh. PROXYLIST_SOURCE_FILE dan
+    PROXY_SOURCE_FILE tetap ditulis sebagai checkpoint setelah download selesai.
+    """
+    ui.print_header()
+    ui.console.print("[bold cyan]Mode Streaming: Download & Tes Paralel...[/bold cyan]")
+    if not is_auto and not tester.load_github_token():
+        ui.console.print("[bold red]Tes proxy dibatalkan: Gagal memuat token GitHub.[/bold red]")
+        return False
+
+    stream = pipeline.ProxyStream()
+    seen = set()
+    download_result = {"ok": False}
+
+    def feed(lines):
+        # Konversi + dedupe per list, langsung masuk antrian tes
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            converted = utils.convert_proxy_line(line)
+            if converted and converted not in seen:
+                seen.add(converted)
+                stream.put(converted)
+
+    def produce():
+        try:
+            download_result["ok"] = download_proxies_from_api(is_auto=is_auto, on_list=feed)
+        except Exception as e:
+            ui.console.print(f"[bold red]Download gagal: {e}[/bold red]")
+        finally:
+            stream.close()
+
+    producer = threading.Thread(target=produce, name="proxy-download", daemon=True)
+    producer.start()
+    good_proxies = run_proxy_tests(stream, is_auto=is_auto, engine=engine, want=want)
+    producer.join()
+
+    # Checkpoint: proxy.txt = hasil konversi + dedupe (sama seperti alur bertahap)
+    if stream.items:
+        try:
+            with open(PROXY_SOURCE_FILE, "w") as f:
+                for proxy in sorted(stream.items): f.write(proxy + "\n")
+            ui.console.print(f"[dim]   Checkpoint: {len(stream.items)} proksi unik -> '{os.path.basename(PROXY_SOURCE_FILE)}'[/dim]")
+        except IOError as e:
+            ui.console.print(f"[yellow]Gagal menulis checkpoint '{os.path.basename(PROXY_SOURCE_FILE)}': {e}[/yellow]")
+        save_tested_snapshot(stream.items, webshare.LAST_PUBLIC_IP, current_test_profile(is_auto))
+    if not download_result["ok"] and not stream.items:
+        ui.console.print("[bold red]Berhenti: Tidak ada proxy yang berhasil diunduh.[/bold red]")
+        return False
+
+    if not good_proxies:
+        ui.console.print("[bold red]Berhenti: Tidak ada proksi yang lolos tes.[/bold red]")
+        if os.path.exists(SUCCESS_PROXY_FILE):
+            try: os.remove(SUCCESS_PROXY_FILE)
+            except OSError as e: ui.console.print(f"[yellow] Gagal menghapus '{os.path.basename(SUCCESS_PROXY_FILE)}': {e}[/yellow]")
+        return False
+    ui.console.print(f"[bold green]{len(good_proxies)} proksi lolos tes.[/bold green]")
+    return utils.save_good_proxies(good_proxies, SUCCESS_PROXY_FILE)
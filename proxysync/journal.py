@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import hashlib
+
+import download_cache
+
+# --- Konfigurasi Path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+JOURNAL_FILE = os.path.join(SCRIPT_DIR, "test_journal.jsonl") # Verdict tes yang sedang/terakhir berjalan
+
+# --- Konfigurasi Journal ---
+FSYNC_EVERY = 100 # fsync tiap N verdict (flush ke OS tetap tiap baris)
+
+def test_profile(is_auto, prescreen, targets):
+    """Identitas cara tes: verdict hanya bisa dipakai ulang untuk profil yang sama."""
+    target_digest = hashlib.sha256("|".join(targets).encode()).hexdigest()[:12]
+    return f"{'ipify' if is_auto else 'github'};prescreen={int(bool(prescreen))};targets={target_digest}"
+
+def input_hash(proxies):
+    return download_cache.content_digest(proxies)
+
+def truncate_partial_line(path, chunk_size=4096):
+    """Potong file setelah newline terakhir (buang sisa baris yang terpotong saat crash)."""
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - chunk_size)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline != -1:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos != end: f.truncate(pos)
+
+class VerdictJournal:
+    """Journal append-only (JSON per baris) berisi verdict tiap proxy selama satu run tes.
+
+    Baris pertama = header run (hash input + profil tes), lalu satu baris per verdict,
+    dan baris "done" jika run selesai normal. Run yang terputus (tanpa "done") dengan
+    hash input & profil sama bisa dilanjutkan: lihat open_for_run(resume=True).
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self._file = None
+        self._since_sync = 0
+
+    @staticmethod
+    def read_unfinished(path, run_hash, profile):
+        """Verdict run yang terputus {proxy: entry} jika header cocok, selain itu None."""
+        try:
+            with open(path, "r") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("type") != "run" or header.get("input") != run_hash or header.get("profile") != profile:
+                    return None
+                decided = {}
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue # Baris terpotong saat crash (journal lama bisa punya sisa di tengah file)
+                    if entry.get("type") == "done": return None # Run sudah selesai, tidak ada yang dilanjutkan
+                    if "p" in entry: decided[entry["p"]] = entry
+                return decided
+        except (IOError, ValueError):
+            return None
+
+    def open_for_run(self, run_hash, profile, resume=False):
+        """Mulai (atau lanjutkan) journal. Return {proxy: entry} verdict yang dipakai ulang."""
+        decided = self.read_unfinished(self.path, run_hash, profile) if resume else None
+        if decided is not None:
+            truncate_partial_line(self.path) # Verdict baru tidak boleh menempel di baris yang terpotong
+            self._file = open(self.path, "a")
+            return decided
+        self._file = open(self.path, "w")
+        self._write({"type": "run", "input": run_hash, "profile": profile, "started": round(time.time())})
+        return {}
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._since_sync += 1
+        if self._since_sync >= FSYNC_EVERY:
+            os.fsync(self._file.fileno())
+            self._since_sync = 0
+
+    def record(self, proxy, is_good, reason, latency=None, exit_ip=None):
+        if self._file is None: return
+        entry = {"p": proxy, "ok": 1 if is_good else 0, "r": reason}
+        if latency is not None: entry["ms"] = latency
+        if exit_ip: entry["ip"] = exit_ip
+        self._write(entry)
+
+    def finish(self):
+        """Tandai run selesai (tidak akan dilanjutkan oleh --resume) lalu tutup."""
+        if self._file is None: return
+        self._write({"type": "done", "finished": round(time.time())})
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
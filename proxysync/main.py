@@ -21,11 +21,11 @@ FAIL_PROXY_FILE = os.path.join(SCRIPT_DIR, "fail_proxy.txt")       # Output prox
 SUCCESS_PROXY_FILE = os.path.join(SCRIPT_DIR, "success_proxy.txt") # Output proxy sukses
 PROXY_BACKUP_FILE = os.path.join(SCRIPT_DIR, "proxy_backup.txt")   # Backup proxy.txt
 
-# --- Konfigurasi Tes Proxy ---
-MAX_WORKERS = 10
+# --- Konfigurasi Distribusi ---
+DISTRIBUTE_PREFER_FASTEST = True # success_proxy.txt sudah di-ranking; proxy cepat cenderung di depan
 
 
-def run_full_process():
+def run_full_process(engine="thread"):
     ui.print_header()
     if not tester.load_github_token(): # Panggil dari tester
         ui.console.print("[bold red]Tes proxy dibatalkan (token GitHub?).[/bold red]"); return
@@ -41,10 +41,7 @@ def run_full_process():
     ui.console.print(f"Siap tes {len(proxies)} proksi unik."); ui.console.print("-" * 40)
     ui.console.print("[bold cyan]Langkah 2: Tes Akurat GitHub...[/bold cyan]")
     
-    # === PERBAIKAN: Kirim lambda dengan is_auto=False untuk mode Manual ===
-    check_func_manual = lambda p: tester.check_proxy_final(p, is_auto=False)
-    good_proxies = ui.run_concurrent_checks_display(proxies, check_func_manual, MAX_WORKERS, FAIL_PROXY_FILE) # Panggil dari tester
-    # === AKHIR PERBAIKAN ===
+    good_proxies = flows.run_proxy_tests(proxies, is_auto=False, engine=engine) # Mode Manual (GitHub)
     
     if not good_proxies: ui.console.print("[bold red]Stop: Tidak ada proksi lolos.[/bold red]"); return
     
@@ -62,14 +59,14 @@ def run_full_process():
         ui.console.print("[bold cyan]Langkah 4: Distribusi...[/bold cyan]") # Update nomor langkah
         paths = utils.load_paths(PATHS_SOURCE_FILE) # Panggil dari utils
         if not paths: ui.console.print("[bold red]Stop: 'paths.txt' kosong/invalid. Distribusi dibatalkan.[/bold red]"); return
-        utils.distribute_proxies(good_proxies, paths) # Panggil dari utils
+        utils.distribute_proxies(good_proxies, paths, prefer_fastest=DISTRIBUTE_PREFER_FASTEST) # Panggil dari utils
     else:
         ui.console.print("-" * 40) # Tambah separator
         ui.console.print("[bold cyan]Langkah 4: Distribusi dilewati (sesuai pilihan).[/bold cyan]") # Update nomor langkah
     
     ui.console.print("\n[bold green]✅ Semua langkah selesai![/bold green]")
 
-def main_interactive():
+def main_interactive(engine="thread"):
     while True:
         ui.print_header()
         choice = ui.display_main_menu()
@@ -105,7 +102,7 @@ def main_interactive():
             result = utils.convert_proxylist_to_http() # Panggil dari utils
         elif choice == "4":
             operation_name = "Tes & Distribusi"
-            run_full_process()
+            run_full_process(engine=engine)
             result = True
         elif choice == "5":
             ui.manage_paths_menu_display()
@@ -121,6 +118,18 @@ def main_interactive():
         if choice != "6":
             ui.Prompt.ask("\n[bold]Tekan Enter untuk kembali ke menu...[/bold]")
 
+def want_arg(value):
+    """Validasi argparse untuk --want: angka bulat > 0 atau persen > 0 (mis. 25%)."""
+    text = str(value).strip()
+    percent = text.endswith("%")
+    try:
+        amount = float(text[:-1]) if percent else int(text)
+    except ValueError:
+        amount = 0
+    if not (0 < amount <= 100 if percent else amount > 0): # Juga menolak 'nan%'
+        raise argparse.ArgumentTypeError(f"nilai --want tidak valid: '{value}' (contoh: 300 atau 25%)")
+    return value
+
 if __name__ == "__main__":
     # === PERBAIKAN: Pindahkan os.chdir ke sini ===
     # Pastikan CWD adalah direktori skrip SEBELUM path lain didefinisikan
@@ -132,18 +141,49 @@ if __name__ == "__main__":
     parser.add_argument('--ip-auth-only', action='store_true', help='Only run Webshare IP Authorization sync (non-interactive)')
     parser.add_argument('--get-urls-only', action='store_true', help='Only discover and save Webshare download URLs (non-interactive)')
     parser.add_argument('--test-and-save-only', action='store_true', help='Only run proxy test and save results (non-interactive)')
+    parser.add_argument('--incremental', action='store_true', help='Hanya tes ulang proxy yang verdict-nya lebih tua dari --ttl (pakai health DB)')
+    parser.add_argument('--ttl', type=int, default=flows.VERDICT_TTL_SECONDS, help=f'TTL verdict (detik) untuk --incremental (default: {flows.VERDICT_TTL_SECONDS})')
+    parser.add_argument('--want', metavar='N|P%', type=want_arg, help='Berhenti setelah N proxy lolos (atau P%% dari input), tes urut prioritas; sisanya untested')
+    parser.add_argument('--no-adaptive', action='store_true', help='Matikan concurrency adaptif (AIMD); pakai jumlah worker tetap')
+    parser.add_argument('--no-prescreen', action='store_true', help='Skip tahap pre-screen TCP/CONNECT sebelum tes HTTP penuh')
+    parser.add_argument('--no-adaptive-timeout', action='store_true', help='Matikan timeout adaptif; pakai timeout connect/read default tetap')
+    parser.add_argument('--github-concurrent', action='store_true', help='Tes GitHub: jalankan probe API & web bersamaan (bukan berurutan)')
+    parser.add_argument('--full-retest', action='store_true', help='Tes ulang semua proxy input (matikan tes diff terhadap input tes terakhir & karantina proxy gagal)')
+    parser.add_argument('--collapse-exit-ip', action='store_true', help='Simpan hanya proxy tercepat per exit IP (exit IP dari tes ipify, mode auto)')
+    parser.add_argument('--no-subnet-scheduling', action='store_true', help='Tes semua proxy apa adanya (tanpa perwakilan per subnet/gateway & short-circuit grup mati)')
+    parser.add_argument('--per-host-limit', type=int, metavar='N', help=f'Maks. cek paralel per host proxy/gateway, 0 = tanpa batas (default: {flows.PER_HOST_CONCURRENCY})')
+    parser.add_argument('--resume', action='store_true', help='Lanjutkan run tes yang terputus (input & profil tes sama): proxy yang sudah punya verdict tidak dites ulang')
+    parser.add_argument('--force-ip-sync', action='store_true', help='Sinkronisasi IP Webshare ke API untuk semua akun, walau IP publik sama dengan sync terakhir')
+    parser.add_argument('--stream', action='store_true', help='--full-auto: tes proxy sambil download berjalan (pipeline streaming)')
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread', help='Proxy test engine: thread (ThreadPool, default) or async (asyncio, ribuan cek paralel)')
     args = parser.parse_args()
+    if args.no_prescreen: tester.PRESCREEN_ENABLED = False
+    if args.no_adaptive: flows.ADAPTIVE_CONCURRENCY = False
+    if args.no_adaptive_timeout: tester.ADAPTIVE_TIMEOUTS = False
+    if args.github_concurrent: tester.GITHUB_PROBE_CONCURRENT = True
+    if args.full_retest:
+        flows.DIFF_ONLY_TESTING = False
+        flows.QUARANTINE_ENABLED = False
+    if args.collapse_exit_ip: flows.COLLAPSE_BY_EXIT_IP = True
+    if args.no_subnet_scheduling: flows.SUBNET_SCHEDULING = False
+    if args.resume: flows.RESUME_INTERRUPTED = True
+    if args.force_ip_sync: webshare.FORCE_IP_SYNC = True
+    if args.per_host_limit is not None: flows.PER_HOST_CONCURRENCY = max(0, args.per_host_limit)
     exit_code = 0
     try:
         if args.full_auto:
             ui.console.print("[bold cyan]--- PROXYSYNC FULL AUTO MODE ---[/bold cyan]")
             success = webshare.run_webshare_ip_sync() # Panggil dari webshare
-            if success: success = flows.download_proxies_from_api(is_auto=True) # Panggil dari flows
-            if success: success = utils.convert_proxylist_to_http() # Panggil dari utils
-            
-            # === PERBAIKAN: Kirim is_auto=True ===
-            if success: success = flows.run_automated_test_and_save(is_auto=True) # Panggil dari flows
-            # === AKHIR PERBAIKAN ===
+            if success and args.stream:
+                # Download, konversi & tes berjalan tumpang tindih (file tetap ditulis sebagai checkpoint)
+                success = flows.run_streaming_auto(is_auto=True, engine=args.engine, want=args.want)
+            else:
+                if success: success = flows.download_proxies_from_api(is_auto=True) # Panggil dari flows
+                if success: success = utils.convert_proxylist_to_http(skip_if_unchanged=True) # Panggil dari utils
+                
+                # === PERBAIKAN: Kirim is_auto=True ===
+                if success: success = flows.run_automated_test_and_save(is_auto=True, engine=args.engine, incremental=args.incremental, ttl=args.ttl, want=args.want) # Panggil dari flows
+                # === AKHIR PERBAIKAN ===
             
             if success: ui.console.print("\n[bold green]✅ FULL AUTO MODE SELESAI.[/bold green]")
             else: ui.console.print("\n[bold red]❌ FULL AUTO MODE GAGAL PADA SALAH SATU LANGKAH.[/bold red]"); exit_code = 1
@@ -163,13 +203,13 @@ if __name__ == "__main__":
         elif args.test_and_save_only:
              ui.console.print("[bold cyan]--- PROXYSYNC TEST AND SAVE ONLY MODE ---[/bold cyan]")
              # === PERBAIKAN: Kirim is_auto=True (karena --test-and-save-only juga otomatis) ===
-             success = flows.run_automated_test_and_save(is_auto=True) # Panggil dari flows
+             success = flows.run_automated_test_and_save(is_auto=True, engine=args.engine, incremental=args.incremental, ttl=args.ttl, want=args.want) # Panggil dari flows
              # === AKHIR PERBAIKAN ===
              if success: ui.console.print("\n[bold green]✅ TEST AND SAVE ONLY SELESAI.[/bold green]")
              else: ui.console.print("\n[bold red]❌ TEST AND SAVE ONLY GAGAL.[/bold red]"); exit_code = 1
         
         else:
-            main_interactive()
+            main_interactive(engine=args.engine)
     except Exception as e:
          ui.console.print(f"\n[bold red]!!! TERJADI ERROR FATAL !!![/bold red]")
          traceback.print_exc()
@@ -0,0 +1,74 @@
+import queue
+import threading
+
+class ProxyStream:
+    """Antrian proxy yang diisi bertahap oleh producer (thread download) dan dikonsumsi tester.
+
+    Producer memanggil put()/close(); consumer memanggil take(). `items` menyimpan semua
+    proxy yang pernah masuk (urutan kedatangan) untuk checkpoint & daftar untested.
+    """
+    EMPTY = object() # take(block=False): belum ada proxy baru, tapi stream belum selesai
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.items = []
+        self.closed = threading.Event()
+        self._ended = False
+
+    def __len__(self):
+        # Jumlah proxy yang sudah diterima sejauh ini (bertambah selama download berjalan)
+        return len(self.items)
+
+    def put(self, proxy):
+        self.items.append(proxy)
+        self.queue.put(proxy)
+
+    def close(self):
+        self.queue.put(None)
+        self.closed.set()
+
+    def take(self, block=True):
+        """Proxy berikutnya; None jika stream sudah habis; EMPTY jika non-blocking dan belum ada."""
+        if self._ended: return None
+        try:
+            proxy = self.queue.get(block=block)
+        except queue.Empty:
+            return self.EMPTY
+        if proxy is None: self._ended = True
+        return proxy
+
+    def wait_closed(self):
+        self.closed.wait()
+
+class FailureLog:
+    """Tulis proxy gagal ke file begitu hasilnya datang (bukan sekaligus di akhir tes).
+
+    Memori tetap datar untuk list besar: hanya jumlah & `sample_size` contoh pertama
+    (untuk tabel ringkasan) yang disimpan. File dibuka (ditimpa) saat kegagalan pertama,
+    jadi file lama tidak disentuh jika tidak ada yang gagal.
+    """
+
+    def __init__(self, path, sample_size=10, flush_every=200):
+        self.path = path
+        self.sample_size = sample_size
+        self.flush_every = flush_every
+        self.count = 0
+        self.sample = [] # [(proxy, reason)] pertama
+        self._file = None
+        self.error = None
+
+    def record(self, proxy, reason):
+        self.count += 1
+        if len(self.sample) < self.sample_size: self.sample.append((proxy, reason))
+        if self.error is not None: return
+        try:
+            if self._file is None: self._file = open(self.path, "w")
+            self._file.write(proxy + "\n")
+            if self.count % self.flush_every == 0: self._file.flush()
+        except (IOError, OSError) as e:
+            self.error = e # Dilaporkan di ringkasan; tes tetap berjalan
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,123 @@
+import os
+import re
+import mmap
+from typing import NamedTuple
+
+# --- Pola Proxy (dikompilasi sekali) ---
+# Format yang didukung: host:port | host:port:user:pass | user:pass@host:port | http(s)://[user:pass@]host:port
+# Dipisah dua regex (dipilih lewat `"@" in line`) agar baris tanpa '@' tidak membayar backtracking `(.+)@`.
+_HOST = r"(?:[0-9]{1,3}\.){3}[0-9]{1,3}|(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}"
+PLAIN_RE = re.compile(
+    r"(?:(https?)://)?"                     # scheme (opsional)
+    rf"({_HOST}):([0-9]{{1,5}})"            # host:port
+    r"(?::([^:]+):([^:]*))?/?",             # :user:pass di belakang (opsional)
+    re.IGNORECASE,
+)
+AUTH_RE = re.compile(
+    r"(?:(https?)://)?"                     # scheme (opsional)
+    r"(.+)@"                                # user[:pass]@
+    rf"({_HOST}):([0-9]{{1,5}})/?",         # host:port
+    re.IGNORECASE,
+)
+READ_CHUNK_SIZE = 64 * 1024 # Byte per blok mmap yang di-decode sekaligus di iter_*_lines
+_new_tuple = tuple.__new__ # Membuat Proxy tanpa __new__ NamedTuple (Python-level) di loop panas
+
+class Proxy(NamedTuple):
+    """Record proxy ringkas (tuple, tanpa __dict__). `port` int, user/password None jika tanpa auth.
+
+    `url` adalah bentuk kanonik (scheme & host lowercase) dan dipakai sebagai kunci dedupe.
+    """
+    scheme: str
+    host: str
+    port: int
+    user: str | None = None
+    password: str | None = None
+
+    @property
+    def url(self):
+        """Format http(s):// yang dipakai tester & file output."""
+        auth = ""
+        if self.user is not None:
+            auth = f"{self.user}:{self.password}@" if self.password is not None else f"{self.user}@"
+        return f"{self.scheme}://{auth}{self.host}:{self.port}"
+
+    def __str__(self):
+        return self.url
+
+def _fields(line):
+    # (scheme, host, port, user, password) ternormalisasi dari baris yang sudah di-strip, atau None
+    if "@" in line:
+        match = AUTH_RE.fullmatch(line)
+        if match is not None:
+            scheme, auth, host, port = match.groups()
+            user, sep, password = auth.partition(":")
+            if not sep: password = None
+        else: # '@' bisa juga bagian dari user/pass di format host:port:user:pass
+            match = PLAIN_RE.fullmatch(line)
+            if match is None: return None
+            scheme, host, port, user, password = match.groups()
+    else:
+        match = PLAIN_RE.fullmatch(line)
+        if match is None: return None
+        scheme, host, port, user, password = match.groups()
+    port = int(port)
+    if not 1 <= port <= 65535: return None
+    # Scheme & host case-insensitive: dinormalisasi agar .url sekaligus jadi kunci kanonik
+    return (scheme.lower() if scheme else "http", host.lower(), port, user, password)
+
+def parse_proxy_line(line):
+    """Parse satu baris (str) jadi Proxy, atau None jika format tidak dikenali / port invalid."""
+    fields = _fields(line.strip())
+    return _new_tuple(Proxy, fields) if fields is not None else None
+
+def canonical_key(line):
+    """Identitas proxy lintas format: ip:port:user:pass, user:pass@ip:port dan http://user:pass@ip:port
+    untuk endpoint yang sama menghasilkan kunci yang sama. Baris yang tidak bisa di-parse -> apa adanya."""
+    proxy = parse_proxy_line(line)
+    return proxy.url if proxy is not None else line.strip()
+
+def dedupe(lines):
+    """Buang duplikat berdasarkan canonical_key; urutan & bentuk kemunculan pertama dipertahankan."""
+    seen, unique = set(), []
+    for line in lines:
+        key = canonical_key(line)
+        if key in seen: continue
+        seen.add(key)
+        unique.append(line)
+    return unique
+
+def _iter_stripped_lines(file_path):
+    # Baris non-kosong & bukan komentar. mmap dibaca per blok READ_CHUNK_SIZE (dipotong di batas baris)
+    # lalu di-decode & dipecah sekaligus: memori tetap kecil tanpa overhead readline/decode per baris.
+    if os.path.getsize(file_path) == 0: return
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while True:
+            block = mm.read(READ_CHUNK_SIZE)
+            if not block: return
+            if block[-1:] != b"\n": block += mm.readline()
+            for line in map(str.strip, block.decode("utf-8", "replace").split("\n")):
+                if line and line[0] != "#": yield line
+
+def iter_parsed_lines(file_path):
+    """Yield (baris, Proxy|None) untuk tiap baris non-kosong & bukan komentar.
+
+    File dibaca lewat mmap sehingga list multi-juta baris tidak pernah dimuat utuh ke memori.
+    """
+    for line in _iter_stripped_lines(file_path):
+        fields = _fields(line)
+        yield line, (_new_tuple(Proxy, fields) if fields is not None else None)
+
+def iter_proxy_urls(file_path):
+    """Seperti iter_parsed_lines, tetapi yield (baris, url kanonik|None) tanpa membuat Proxy.
+
+    Jalur cepat untuk konversi file besar yang hanya butuh bentuk http(s)://.
+    """
+    for line in _iter_stripped_lines(file_path):
+        fields = _fields(line)
+        if fields is None:
+            yield line, None
+            continue
+        scheme, host, port, user, password = fields
+        if user is None: yield line, f"{scheme}://{host}:{port}"
+        elif password is None: yield line, f"{scheme}://{user}@{host}:{port}"
+        else: yield line, f"{scheme}://{user}:{password}@{host}:{port}"
@@ -0,0 +1,312 @@
+import os
+import time
+import sqlite3
+from urllib.parse import urlsplit
+import ui # Mengimpor semua fungsi UI dari file ui.py
+import proxy_parser
+import concurrency
+import scheduler
+
+# --- Konfigurasi Path ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HEALTH_DB_FILE = os.path.join(SCRIPT_DIR, "proxy_health.db")
+
+# --- Konfigurasi Health DB ---
+SUCCESS_RATE_ALPHA = 0.3    # Bobot hasil terbaru untuk rolling success rate (EWMA)
+HISTORY_KEEP_DAYS = 14      # Riwayat cek lebih tua dari ini dihapus saat close()
+COMMIT_EVERY = 500          # Commit batch tiap N hasil (hemat I/O saat tes besar)
+
+# --- Konfigurasi Karantina ---
+# Proxy yang gagal beruntun (per IP publik & profil tes) dilewati hingga backoff habis:
+# BASE x 2^(gagal beruntun - MIN), maks. MAX. Di bawah MIN kegagalan beruntun tidak dikarantina.
+QUARANTINE_MIN_FAILURES = 2
+QUARANTINE_BASE_SECONDS = 1800
+QUARANTINE_MAX_SECONDS = 7 * 86400
+# Gagal yang bukan salah proxy (auth/IP belum diotorisasi, rate limit, kongesti lokal) atau yang tidak
+# benar-benar dites (anggota subnet yang di-short-circuit) tidak dihitung
+QUARANTINE_EXEMPT_MARKERS = ("Proxy Auth (407)", scheduler.SHORT_CIRCUIT_REASON) + concurrency.CONGESTION_MARKERS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxy_health (
+    proxy TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_checked REAL NOT NULL,
+    last_ok INTEGER NOT NULL,
+    last_reason TEXT,
+    last_latency REAL,
+    total_checks INTEGER NOT NULL DEFAULT 0,
+    total_ok INTEGER NOT NULL DEFAULT 0,
+    success_rate REAL NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    exit_ip TEXT
+);
+CREATE TABLE IF NOT EXISTS check_history (
+    proxy TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    latency REAL,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS verdict_cache (
+    proxy TEXT NOT NULL,
+    public_ip TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    reason TEXT,
+    latency REAL,
+    exit_ip TEXT,
+    PRIMARY KEY (proxy, public_ip, profile)
+);
+CREATE TABLE IF NOT EXISTS quarantine (
+    proxy TEXT NOT NULL,
+    public_ip TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    consecutive_failures INTEGER NOT NULL,
+    last_checked REAL NOT NULL,
+    last_reason TEXT,
+    PRIMARY KEY (proxy, public_ip, profile)
+);
+CREATE INDEX IF NOT EXISTS idx_history_proxy ON check_history (proxy, checked_at);
+CREATE INDEX IF NOT EXISTS idx_health_checked ON proxy_health (last_checked);
+"""
+
+# Kolom yang ditambahkan setelah skema awal: (nama, definisi) untuk migrasi DB lama
+MIGRATION_COLUMNS = [("exit_ip", "TEXT")]
+
+UPSERT_SQL = """
+INSERT INTO proxy_health (proxy, first_seen, last_checked, last_ok, last_reason, last_latency,
+                          total_checks, total_ok, success_rate, consecutive_failures, exit_ip)
+VALUES (:proxy, :now, :now, :ok, :reason, :latency, 1, :ok, :ok, 1 - :ok, :exit_ip)
+ON CONFLICT(proxy) DO UPDATE SET
+    last_checked = :now,
+    last_ok = :ok,
+    last_reason = :reason,
+    last_latency = COALESCE(:latency, last_latency),
+    total_checks = total_checks + 1,
+    total_ok = total_ok + :ok,
+    success_rate = success_rate * (1 - :alpha) + :ok * :alpha,
+    consecutive_failures = CASE WHEN :ok = 1 THEN 0 ELSE consecutive_failures + 1 END,
+    exit_ip = COALESCE(:exit_ip, exit_ip)
+"""
+
+# Verdict cache: hanya berlaku untuk IP publik & profil tes yang sama (otorisasi IP Webshare)
+CACHE_UPSERT_SQL = """
+INSERT OR REPLACE INTO verdict_cache (proxy, public_ip, profile, checked_at, ok, reason, latency, exit_ip)
+VALUES (:proxy, :public_ip, :profile, :now, :ok, :reason, :latency, :exit_ip)
+"""
+# Kolom dialias seperti proxy_health agar pemakai fresh_verdicts tidak perlu tahu sumbernya
+CACHE_SELECT_SQL = """
+SELECT proxy, checked_at AS last_checked, ok AS last_ok, reason AS last_reason, latency AS last_latency, exit_ip
+FROM verdict_cache WHERE public_ip = ? AND profile = ? AND checked_at >= ? AND proxy IN ({placeholders})
+"""
+
+# Karantina: kunci sama dengan verdict cache; lolos = hitungan dihapus, gagal yang dikecualikan = tidak diubah
+QUARANTINE_FAIL_SQL = """
+INSERT INTO quarantine (proxy, public_ip, profile, consecutive_failures, last_checked, last_reason)
+VALUES (:proxy, :public_ip, :profile, 1, :now, :reason)
+ON CONFLICT(proxy, public_ip, profile) DO UPDATE SET
+    consecutive_failures = consecutive_failures + 1,
+    last_checked = :now,
+    last_reason = :reason
+"""
+QUARANTINE_CLEAR_SQL = "DELETE FROM quarantine WHERE proxy = :proxy AND public_ip = :public_ip AND profile = :profile"
+QUARANTINE_SELECT_SQL = """
+SELECT proxy, consecutive_failures, last_checked, last_reason
+FROM quarantine WHERE public_ip = ? AND profile = ? AND consecutive_failures >= ? AND proxy IN ({placeholders})
+"""
+
+def latency_score(latency_ms, success_rate=1.0):
+    """Skor ranking (lebih kecil = lebih baik): latency, dihukum s/d 2x jika sering gagal."""
+    if latency_ms is None: return float("inf")
+    return round(latency_ms / (0.5 + 0.5 * success_rate), 1)
+
+def quarantine_backoff(consecutive_failures, base=QUARANTINE_BASE_SECONDS, cap=QUARANTINE_MAX_SECONDS, min_failures=QUARANTINE_MIN_FAILURES):
+    """Lama karantina (detik) setelah `consecutive_failures` kegagalan beruntun; 0 = tidak dikarantina."""
+    if consecutive_failures < max(min_failures, 1): return 0
+    return min(base * 2 ** min(consecutive_failures - min_failures, 32), cap)
+
+def counts_toward_quarantine(reason):
+    """True jika kegagalan ini menambah hitungan karantina (proxy/host mati, bukan auth/rate limit/kongesti)."""
+    return not any(marker in (reason or "") for marker in QUARANTINE_EXEMPT_MARKERS)
+
+def normalize_proxy(proxy):
+    """Kunci DB: proxy_parser.canonical_key, agar sama dengan kunci dedupe di file & journal.
+
+    Baris yang tidak dikenali parser (mis. socks5://, tanpa port) tetap dinormalisasi via urlsplit.
+    """
+    parsed = proxy_parser.parse_proxy_line(proxy)
+    if parsed is not None: return parsed.url
+    proxy = proxy.strip()
+    if "://" not in proxy: proxy = f"http://{proxy}"
+    parts = urlsplit(proxy)
+    if not parts.hostname: return proxy
+    auth = ""
+    if parts.username is not None:
+        auth = f"{parts.username}:{parts.password}@" if parts.password is not None else f"{parts.username}@"
+    port = f":{parts.port}" if parts.port else ""
+    return f"{parts.scheme.lower()}://{auth}{parts.hostname.lower()}{port}"
+
+class ProxyHealthDB:
+    """Penyimpanan SQLite untuk riwayat & kesehatan tiap proxy."""
+
+    def __init__(self, path=HEALTH_DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._pending = 0
+
+    def _migrate(self):
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(proxy_health)")}
+        for name, definition in MIGRATION_COLUMNS:
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE proxy_health ADD COLUMN {name} {definition}")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Tulis ---
+    def record_result(self, proxy, is_good, reason, latency=None, checked_at=None, exit_ip=None, public_ip=None, profile=None):
+        """Catat satu hasil tes (kontrak sama dengan tester: proxy, ok, reason).
+
+        `exit_ip` (jika ada) menimpa IP keluar tersimpan; None mempertahankan yang lama.
+        Dengan `public_ip` & `profile`, verdict juga masuk verdict cache (lihat fresh_verdicts).
+        """
+        now = checked_at or time.time()
+        key = normalize_proxy(proxy)
+        ok = 1 if is_good else 0
+        params = {
+            "proxy": key, "now": now, "ok": ok, "reason": reason,
+            "latency": latency, "alpha": SUCCESS_RATE_ALPHA, "exit_ip": exit_ip,
+        }
+        self.conn.execute(UPSERT_SQL, params)
+        if public_ip and profile:
+            keyed = dict(params, public_ip=public_ip, profile=profile)
+            self.conn.execute(CACHE_UPSERT_SQL, keyed)
+            if ok: self.conn.execute(QUARANTINE_CLEAR_SQL, keyed)
+            elif counts_toward_quarantine(reason): self.conn.execute(QUARANTINE_FAIL_SQL, keyed)
+        self.conn.execute(
+            "INSERT INTO check_history (proxy, checked_at, ok, latency, reason) VALUES (?, ?, ?, ?, ?)",
+            (key, now, ok, latency, reason)
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY: self.flush()
+
+    def flush(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def prune_history(self, keep_days=HISTORY_KEEP_DAYS):
+        cutoff = time.time() - keep_days * 86400
+        self.conn.execute("DELETE FROM check_history WHERE checked_at < ?", (cutoff,))
+        self.conn.execute("DELETE FROM verdict_cache WHERE checked_at < ?", (cutoff,))
+        self.conn.execute("DELETE FROM quarantine WHERE last_checked < ?", (cutoff,))
+        self.flush()
+
+    def invalidate_other_ips(self, public_ip):
+        """Buang verdict cache (dan karantina) dari IP publik selain `public_ip`. Return jumlah verdict."""
+        count = self.conn.execute("DELETE FROM verdict_cache WHERE public_ip != ?", (public_ip,)).rowcount
+        self.conn.execute("DELETE FROM quarantine WHERE public_ip != ?", (public_ip,))
+        self.flush()
+        return count
+
+    def close(self):
+        try:
+            self.prune_history()
+        finally:
+            self.conn.close()
+
+    # --- Query ---
+    def get_many(self, proxies):
+        """Dict {proxy_asli: row} untuk proxy yang sudah pernah dites."""
+        keys = {normalize_proxy(p): p for p in proxies}
+        found = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), 500): # Batas parameter SQLite
+            chunk = key_list[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT * FROM proxy_health WHERE proxy IN ({placeholders})", chunk):
+                found[keys[row["proxy"]]] = row
+        return found
+
+    def fresh_verdicts(self, proxies, max_age, public_ip=None, profile=None):
+        """Dict {proxy: row} untuk proxy yang dicek dalam `max_age` detik terakhir.
+
+        Dengan `public_ip` & `profile`, hanya verdict cache dari IP publik & profil tes
+        yang sama yang dipakai (verdict dari IP lain tidak pernah dipakai ulang).
+        """
+        cutoff = time.time() - max_age
+        if public_ip is None or profile is None:
+            return {p: row for p, row in self.get_many(proxies).items() if row["last_checked"] >= cutoff}
+        keys = {normalize_proxy(p): p for p in proxies}
+        key_list = list(keys)
+        found = {}
+        for i in range(0, len(key_list), 500): # Batas parameter SQLite
+            chunk = key_list[i:i + 500]
+            sql = CACHE_SELECT_SQL.format(placeholders=",".join("?" * len(chunk)))
+            for row in self.conn.execute(sql, [public_ip, profile, cutoff] + chunk):
+                found[keys[row["proxy"]]] = row
+        return found
+
+    def unchecked_since(self, proxies, since):
+        """Yield proxy dari `proxies` (urutan tetap) yang belum dicek sejak `since` (epoch), per chunk."""
+        for i in range(0, len(proxies), 500): # Batas parameter SQLite
+            chunk = proxies[i:i + 500]
+            keys = [normalize_proxy(p) for p in chunk]
+            placeholders = ",".join("?" * len(keys))
+            checked = {row["proxy"] for row in self.conn.execute(
+                f"SELECT proxy FROM proxy_health WHERE last_checked >= ? AND proxy IN ({placeholders})", [since] + keys)}
+            for p, key in zip(chunk, keys):
+                if key not in checked: yield p
+
+    def quarantined(self, proxies, public_ip, profile, now=None):
+        """Dict {proxy: (row, sampai_kapan)} untuk proxy yang backoff karantinanya belum habis.
+
+        Hanya hitungan dari IP publik & profil tes yang sama (seperti fresh_verdicts).
+        """
+        now = now or time.time()
+        keys = {normalize_proxy(p): p for p in proxies}
+        key_list = list(keys)
+        found = {}
+        for i in range(0, len(key_list), 500): # Batas parameter SQLite
+            chunk = key_list[i:i + 500]
+            sql = QUARANTINE_SELECT_SQL.format(placeholders=",".join("?" * len(chunk)))
+            for row in self.conn.execute(sql, [public_ip, profile, QUARANTINE_MIN_FAILURES] + chunk):
+                until = row["last_checked"] + quarantine_backoff(row["consecutive_failures"])
+                if until > now: found[keys[row["proxy"]]] = (row, until)
+        return found
+
+    def prioritize_for_testing(self, proxies):
+        """Urutan tes: terakhir lolos (skor terbaik dulu), lalu belum dikenal, lalu yang terakhir gagal."""
+        rows = self.get_many(proxies)
+        def sort_key(p):
+            row = rows.get(p)
+            if row is None: return (1, 0.0)
+            if row["last_ok"]: return (0, latency_score(row["last_latency"], row["success_rate"]))
+            return (2, -row["success_rate"])
+        return sorted(proxies, key=sort_key)
+
+def note_public_ip(public_ip, path=HEALTH_DB_FILE):
+    """Dipanggil tiap IP publik diketahui: buang verdict cache milik IP lama. Return jumlah entry."""
+    if not os.path.exists(path): return 0
+    try:
+        with ProxyHealthDB(path) as health_db:
+            return health_db.invalidate_other_ips(public_ip)
+    except sqlite3.Error:
+        return 0
+
+def open_health_db(path=HEALTH_DB_FILE):
+    """Buka health DB; return None (dengan peringatan) jika gagal agar tes tetap jalan."""
+    try:
+        return ProxyHealthDB(path)
+    except sqlite3.Error as e:
+        ui.console.print(f"[yellow]Health DB '{os.path.basename(path)}' tidak bisa dibuka ({e}). Lanjut tanpa riwayat.[/yellow]")
+        return None
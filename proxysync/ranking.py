@@ -0,0 +1,15 @@
+import random
+
+# Modul tanpa dependensi (tidak mengimpor ui/rich) agar bisa dipakai juga oleh deploy_bots.py.
+
+def rank_biased_shuffle(proxies):
+    """Acak list yang sudah di-ranking, tapi proxy di ranking atas cenderung tetap di depan.
+
+    Bobot 1/sqrt(rank) dengan kunci random()^(1/bobot) (weighted shuffle tanpa
+    pengembalian), jadi tiap folder bot dapat urutan berbeda yang condong ke proxy cepat.
+    Urutan masuk berasal dari skor latency total; kolom fase (connect/tunnel/tls) di CSV
+    skor tidak dipakai karena hanya terisi untuk hasil engine async.
+    """
+    keyed = [(random.random() ** ((i + 1) ** 0.5), p) for i, p in enumerate(proxies)]
+    keyed.sort(key=lambda item: item[0], reverse=True)
+    return [p for _, p in keyed]
@@ -0,0 +1,62 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+# --- Konfigurasi Rate Limit ---
+HOST_RATE = 2.0          # Token per detik per host (rata-rata request/detik)
+HOST_BURST = 4           # Kapasitas bucket: request beruntun maksimum per host
+BACKOFF_BASE = 2.0       # Detik; dasar exponential backoff
+BACKOFF_CAP = 60.0       # Detik; batas atas satu jeda backoff
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Exponential backoff dengan full jitter: acak di [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def parse_retry_after(value):
+    """Nilai header Retry-After (detik atau HTTP-date) -> detik tunggu, atau None jika tidak valid."""
+    if not value: return None
+    value = value.strip()
+    if value.isdigit(): return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HostRateLimiter:
+    """Token bucket per host (thread-safe).
+
+    `acquire(host)` memblokir sampai ada token untuk host itu; `penalize(host, detik)`
+    menahan SEMUA request ke host tersebut (mis. dari Retry-After) tanpa menahan host lain.
+    """
+
+    def __init__(self, rate=HOST_RATE, burst=HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.buckets = {} # host -> [tokens, last_refill, blocked_until]
+
+    def acquire(self, host):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                bucket = self.buckets.setdefault(host, [float(self.burst), now, 0.0])
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                if now < bucket[2]:
+                    wait = bucket[2] - now
+                elif bucket[0] >= 1:
+                    bucket[0] -= 1
+                    return
+                else:
+                    wait = (1 - bucket[0]) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, host, seconds):
+        """Blokir host selama `seconds` detik dan kosongkan bucket-nya."""
+        with self.lock:
+            now = time.monotonic()
+            bucket = self.buckets.setdefault(host, [0.0, now, 0.0])
+            bucket[0] = 0.0
+            bucket[1] = now
+            bucket[2] = max(bucket[2], now + seconds)
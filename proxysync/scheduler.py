@@ -0,0 +1,252 @@
+import math
+from collections import deque
+
+import proxy_parser
+
+# --- Konfigurasi Scheduler Subnet ---
+REPRESENTATIVES_PER_GROUP = 2   # Proxy perwakilan yang dites dulu per /24 atau host gateway
+DEAD_GROUP_SAMPLE_RATE = 0.1    # Grup yang semua perwakilannya gagal keras: hanya sampel ini yang dites
+SUBNET_LOOKAHEAD = 5000         # Maks. proxy yang ditahan menunggu hasil perwakilan/sampel grupnya
+# Alasan gagal yang dianggap "gagal keras" (host/range mati, bukan proxy yang lambat/auth salah).
+# Connect timeout ikut dihitung: range yang di-blackhole tidak menolak, hanya diam.
+HARD_FAILURE_MARKERS = (
+    "ConnectionRefused", "Connection refused",
+    "EHOSTUNREACH", "ENETUNREACH", "No route to host", "Network is unreachable",
+    "Connect Timeout",
+)
+SHORT_CIRCUIT_REASON = "Subnet mati (short-circuit, tidak dites)" # Verdict gagal untuk anggota grup yang dilewati
+
+def group_key(proxy):
+    """Kunci grup: '/24' untuk host IPv4, nama host untuk gateway (mis. p.webshare.io)."""
+    parsed = proxy_parser.parse_proxy_line(proxy)
+    if parsed is None: return proxy
+    if parsed.host.replace(".", "").isdigit(): return parsed.host.rsplit(".", 1)[0] + ".0/24"
+    return parsed.host
+
+def is_hard_failure(reason):
+    return any(marker in reason for marker in HARD_FAILURE_MARKERS)
+
+class _Group:
+    __slots__ = ("key", "waiting", "state", "probes_total", "probes_done", "hard_failures", "tested", "passed")
+
+    def __init__(self, key):
+        self.key = key
+        self.waiting = deque()  # Anggota yang ditahan menunggu hasil perwakilan/sampel
+        self.state = "probing"  # probing -> open | sampling -> open | dead
+        self.probes_total = 0   # Perwakilan (probing) atau sampel (sampling) yang sudah dirilis
+        self.probes_done = 0
+        self.hard_failures = 0
+        self.tested = 0
+        self.passed = 0
+
+class SubnetScheduler:
+    """Urutan tes yang sadar subnet/gateway: perwakilan tiap grup dites lebih dulu.
+
+    Proxy ditarik dari `proxies` secara bertahap: anggota grup yang masih menunggu hasil
+    perwakilan ditahan (maks. `lookahead`), grup yang hidup langsung diteruskan.
+    Grup yang semua perwakilannya gagal keras hanya disampel (DEAD_GROUP_SAMPLE_RATE);
+    jika tidak ada sampel yang lolos, sisa anggotanya dilewati (short-circuit) dan
+    dicatat di `short_circuited` {grup: jumlah dilewati}; tiap anggota yang dilewati juga
+    diteruskan ke `on_short_circuit(proxy)` agar tetap punya verdict. Antarmuka take()/EMPTY/len()
+    sama dengan pipeline.ProxyStream, jadi bisa langsung dipakai engine tes di ui.py;
+    hasil tiap cek harus diteruskan ke record().
+    """
+    EMPTY = object() # Antrian kosong, tapi masih menunggu hasil perwakilan/sampel
+
+    def __init__(self, proxies, representatives=REPRESENTATIVES_PER_GROUP, sample_rate=DEAD_GROUP_SAMPLE_RATE, on_short_circuit=None, lookahead=SUBNET_LOOKAHEAD):
+        self.source = iter(proxies)
+        self.total = len(proxies)
+        self.representatives = representatives
+        self.sample_rate = sample_rate
+        self.on_short_circuit = on_short_circuit
+        self.lookahead = lookahead
+        self.groups = {}        # Satu entry per grup (bukan per proxy)
+        self.queue = deque()    # Siap dites
+        self.blocked = set()    # Grup yang punya anggota ditahan
+        self.buffered = 0
+        self.source_done = False
+        self.skipped = 0
+        self.short_circuited = {}
+
+    def __len__(self):
+        # Jumlah proxy yang (akan) dites: menyusut saat grup di-short-circuit
+        return self.total - self.skipped
+
+    def describe_input(self):
+        return f"{self.total} proxies (dikelompokkan per subnet/gateway, perwakilan dites dulu)"
+
+    def take(self, block=True):
+        """Proxy berikutnya; EMPTY jika masih menunggu hasil perwakilan; None jika selesai."""
+        while True:
+            if self.queue: return self.queue.popleft()
+            if self.source_done or self.buffered >= self.lookahead:
+                if self._settle(): continue
+                return self.EMPTY if self.blocked else None
+            p = next(self.source, None)
+            if p is None: self.source_done = True
+            else: self._admit(p)
+
+    def _admit(self, p):
+        """Arahkan satu proxy baru dari sumber sesuai status grupnya."""
+        key = group_key(p)
+        group = self.groups.get(key)
+        if group is None: group = self.groups[key] = _Group(key)
+        if group.state == "open":
+            self.queue.append(p)
+        elif group.state == "dead":
+            self._skip(group, [p])
+        elif group.state == "probing" and group.probes_total < self.representatives:
+            self.queue.append(p)
+            group.probes_total += 1
+        else:
+            group.waiting.append(p)
+            self.buffered += 1
+            self.blocked.add(group)
+
+    def _settle(self):
+        """Grup sampling tanpa sampel yang berjalan: sampel dari anggota yang ditahan. Return True jika ada yang dirilis."""
+        released = False
+        for group in list(self.blocked):
+            if group.state == "sampling" and group.probes_done >= group.probes_total:
+                self._queue_samples(group)
+                released = True
+        return released
+
+    def _take_waiting(self, group):
+        members = list(group.waiting)
+        self.buffered -= len(members)
+        group.waiting.clear()
+        self.blocked.discard(group)
+        return members
+
+    def _release(self, group):
+        self.queue.extend(self._take_waiting(group))
+        group.state = "open"
+
+    def _start_sampling(self, group):
+        group.state = "sampling"
+        group.probes_total = group.probes_done = 0
+        if group.waiting: self._queue_samples(group)
+        elif self.source_done: group.state = "dead"
+        # Belum ada anggota lain: sampel diambil saat anggota berikutnya ditahan (lihat _settle)
+
+    def _queue_samples(self, group):
+        members = self._take_waiting(group)
+        count = max(1, math.ceil(len(members) * self.sample_rate))
+        step = len(members) / count
+        picked = {int(i * step) for i in range(count)}
+        self.queue.extend(members[i] for i in sorted(picked))
+        group.probes_total += len(picked)
+        for i, p in enumerate(members):
+            if i not in picked: group.waiting.append(p)
+        if group.waiting:
+            self.buffered += len(group.waiting)
+            self.blocked.add(group)
+
+    def _skip(self, group, members):
+        self.short_circuited[group.key] = self.short_circuited.get(group.key, 0) + len(members)
+        self.skipped += len(members)
+        if self.on_short_circuit is not None:
+            for p in members: self.on_short_circuit(p)
+
+    def _mark_dead(self, group):
+        group.state = "dead"
+        members = self._take_waiting(group)
+        if members: self._skip(group, members)
+
+    def record(self, result):
+        proxy, is_good, reason = result[0], result[1], result[2]
+        group = self.groups.get(group_key(proxy)) # Dihitung ulang, bukan dict per proxy: memori tetap per grup
+        if group is None: return
+        group.tested += 1
+        if is_good: group.passed += 1
+        if group.state == "probing":
+            group.probes_done += 1
+            if not is_good and is_hard_failure(reason): group.hard_failures += 1
+            if group.probes_done < group.probes_total: return
+            if group.hard_failures < group.probes_total: self._release(group)
+            elif group.probes_total >= self.representatives or self.source_done: self._start_sampling(group)
+            # Perwakilan masih kurang dan sumber belum habis: anggota berikutnya jadi perwakilan
+        elif group.state == "sampling":
+            group.probes_done += 1
+            if is_good: self._release(group) # Range ternyata hidup: tes semua sisanya
+            elif group.probes_done >= group.probes_total: self._mark_dead(group)
+
+    def summary_rows(self):
+        """(grup, dilewati, dites, lolos) untuk grup yang di-short-circuit, terbanyak dilewati dulu."""
+        rows = [(key, skipped, self.groups[key].tested, self.groups[key].passed) for key, skipped in self.short_circuited.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+# --- Konfigurasi Fairness per Host ---
+HOST_FAIR_LOOKAHEAD = 5000 # Maks. proxy yang ditahan di buffer saat semua host di depan sedang penuh
+
+def upstream_host(proxy):
+    """Host proxy (mis. gateway p.webshare.io) yang menerima koneksi tes."""
+    parsed = proxy_parser.parse_proxy_line(proxy)
+    return parsed.host if parsed is not None else proxy
+
+class HostFairQueue:
+    """Batas cek paralel per host proxy + giliran round-robin antar host.
+
+    Membungkus sumber proxy (iterable, atau objek take() seperti ProxyStream/SubnetScheduler).
+    take() hanya mengembalikan proxy dari host yang cek aktifnya < `per_host_limit`,
+    bergiliran antar host; release(proxy) dipanggil engine setelah cek proxy itu selesai.
+    """
+    EMPTY = object() # Semua host yang punya antrian sedang penuh (atau sumber belum mengirim proxy)
+
+    def __init__(self, source, per_host_limit, lookahead=HOST_FAIR_LOOKAHEAD):
+        self.source = source
+        self.source_iter = None if hasattr(source, "take") else iter(source)
+        self.per_host_limit = per_host_limit
+        self.lookahead = lookahead
+        self.buffers = {}       # host -> deque proxy yang menunggu giliran
+        self.rotation = deque() # Host dengan buffer tidak kosong, urutan giliran
+        self.active = {}        # host -> jumlah cek yang sedang berjalan
+        self.buffered = 0
+        self.source_done = False
+
+    def _pull(self, block):
+        """Ambil satu proxy dari sumber: proxy, EMPTY (belum ada), atau None (habis)."""
+        if self.source_done: return None
+        if self.source_iter is not None:
+            p = next(self.source_iter, None)
+        else:
+            p = self.source.take(block=block)
+            if p is self.source.EMPTY: return self.EMPTY
+        if p is None: self.source_done = True
+        return p
+
+    def _next_ready(self):
+        for _ in range(len(self.rotation)):
+            host = self.rotation[0]
+            self.rotation.rotate(-1)
+            if self.active.get(host, 0) < self.per_host_limit:
+                buffer = self.buffers[host]
+                p = buffer.popleft()
+                if not buffer:
+                    del self.buffers[host]
+                    self.rotation.pop() # Host ini baru saja diputar ke ujung kanan
+                self.buffered -= 1
+                self.active[host] = self.active.get(host, 0) + 1
+                return p
+        return None
+
+    def take(self, block=True):
+        while True:
+            p = self._next_ready()
+            if p is not None: return p
+            if self.buffered >= self.lookahead: return self.EMPTY
+            # Hanya blokir sumber jika tidak ada proxy yang tertahan (engine tidak punya cek aktif)
+            p = self._pull(block and not self.buffered)
+            if p is self.EMPTY: return self.EMPTY
+            if p is None: return None if not self.buffered else self.EMPTY
+            host = upstream_host(p)
+            if host not in self.buffers:
+                self.buffers[host] = deque()
+                self.rotation.append(host)
+            self.buffers[host].append(p)
+            self.buffered += 1
+
+    def release(self, proxy):
+        host = upstream_host(proxy)
+        if self.active.get(host, 0) > 0: self.active[host] -= 1
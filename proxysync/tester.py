@@ -1,6 +1,14 @@
 import os
 import sys
+import time
+import errno
+import base64
+import socket
+import threading
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, unquote
 import ui # Mengimpor semua fungsi UI dari file ui.py
 import json # <-- TAMBAHKAN
 
@@ -12,6 +20,33 @@ GITHUB_TOKENS_FILE = os.path.join(CONFIG_DIR, "github_tokens.txt")
 # --- Konfigurasi Tes Proxy ---
 PROXY_TIMEOUT = 25
 
+# Tahap 1 (pre-screen): TCP connect + handshake CONNECT dengan timeout pendek.
+# Proxy mati langsung gugur di sini tanpa menunggu PROXY_TIMEOUT penuh.
+PRESCREEN_ENABLED = True
+PRESCREEN_TIMEOUT = 5
+
+# Timeout adaptif: PROXY_TIMEOUT dipecah jadi connect & read (per fase). Selama tes,
+# nilainya diturunkan dari p95 latency cek yang LOLOS x safety factor, dijepit floor/ceiling.
+ADAPTIVE_TIMEOUTS = True
+CONNECT_TIMEOUT_DEFAULT, CONNECT_TIMEOUT_FLOOR, CONNECT_TIMEOUT_CEILING = 10, 2, 10
+READ_TIMEOUT_DEFAULT, READ_TIMEOUT_FLOOR, READ_TIMEOUT_CEILING = PROXY_TIMEOUT, 4, PROXY_TIMEOUT
+TIMEOUT_PERCENTILE = 0.95
+TIMEOUT_SAFETY_FACTOR = 3.0
+TIMEOUT_MIN_SAMPLES = 30    # Sebelum sampel cukup, pakai nilai *_DEFAULT
+TIMEOUT_SAMPLE_SIZE = 500   # Hanya N sampel terakhir yang dipakai
+TIMEOUT_UPDATE_EVERY = 20   # Hitung ulang percentile tiap N sampel baru
+
+# Tes GitHub memakai satu session keep-alive per proxy: tunnel ke github.com dipakai ulang
+# untuk semua target web. True = probe API & web dijalankan bersamaan (bukan berurutan).
+GITHUB_PROBE_CONCURRENT = False
+
+# Rotasi token GitHub (semua token di baris 3): kuota tiap token dilacak dari header
+# X-RateLimit-*. Jika semua token habis, probe menunggu reset maks. GITHUB_TOKEN_MAX_WAIT
+# detik; lebih dari itu proxy diberi verdict rate-limit (bukan gagal) dan tidak dianggap mati.
+GITHUB_TOKEN_MAX_WAIT = 60
+GITHUB_TOKEN_DEFAULT_COOLDOWN = 60 # Detik; jika respons rate-limit tanpa Reset/Retry-After
+GITHUB_RATE_LIMIT_REASON = "GitHub Rate Limit (semua token habis)"
+
 # === PERBAIKAN: Pisahkan target tes ===
 # Target untuk tes LOKAL (butuh PAT)
 GITHUB_TEST_TARGETS = [
@@ -23,8 +58,151 @@ GITHUB_TEST_TARGETS = [
 IP_TEST_TARGET = "https://api.ipify.org?format=json"
 # === AKHIR PERBAIKAN ===
 
+class CheckResult(tuple):
+    """Hasil tes: tetap tuple (proxy, ok, reason), plus metrik opsional.
+
+    `timings` berisi durasi per fase dalam ms (connect, tunnel, tls, ttfb, total);
+    fase yang tidak terukur tidak dicantumkan. Engine thread (requests) hanya mengukur
+    ttfb/total (ttfb-nya termasuk setup koneksi); connect/tunnel/tls hanya dari engine async. `exit_ip` = IP keluar proxy menurut
+    ipify (hanya tes mode auto yang lolos), selain itu None. `rate_limited` = True jika
+    tes tidak bisa diselesaikan karena kuota token GitHub habis (bukan proxy yang gagal).
+    """
+    def __new__(cls, proxy, ok, reason, timings=None, exit_ip=None, rate_limited=False):
+        result = super().__new__(cls, (proxy, ok, reason))
+        result.timings = timings or {}
+        result.exit_ip = exit_ip
+        result.rate_limited = rate_limited
+        return result
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+class AdaptiveTimeouts:
+    """Timeout connect/read (detik) yang menyesuaikan diri dengan latency teramati.
+
+    `observe()` dipanggil dengan timings cek yang lolos (thread-safe). Timeout read
+    berlaku per fase (CONNECT, TLS, respons), jadi sampelnya = fase read terlama.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connect_samples = deque(maxlen=TIMEOUT_SAMPLE_SIZE)
+            self.read_samples = deque(maxlen=TIMEOUT_SAMPLE_SIZE)
+            self.connect = CONNECT_TIMEOUT_DEFAULT
+            self.read = READ_TIMEOUT_DEFAULT
+            self._since_update = 0
+
+    def observe(self, timings):
+        if not ADAPTIVE_TIMEOUTS or not timings: return
+        read_phases = [timings[k] for k in ("tunnel", "tls", "ttfb") if k in timings]
+        with self.lock:
+            if "connect" in timings: self.connect_samples.append(timings["connect"])
+            if read_phases: self.read_samples.append(max(read_phases))
+            self._since_update += 1
+            if self._since_update >= TIMEOUT_UPDATE_EVERY:
+                self._since_update = 0
+                self.connect = self._derive(self.connect_samples, self.connect, CONNECT_TIMEOUT_FLOOR, CONNECT_TIMEOUT_CEILING)
+                self.read = self._derive(self.read_samples, self.read, READ_TIMEOUT_FLOOR, READ_TIMEOUT_CEILING)
+
+    @staticmethod
+    def _derive(samples_ms, current, floor, ceiling):
+        if len(samples_ms) < TIMEOUT_MIN_SAMPLES: return current
+        ordered = sorted(samples_ms)
+        p = ordered[min(len(ordered) - 1, int(len(ordered) * TIMEOUT_PERCENTILE))]
+        return round(min(ceiling, max(floor, p / 1000 * TIMEOUT_SAFETY_FACTOR)), 2)
+
+    def as_requests_timeout(self):
+        return (self.connect, self.read)
+
+    def describe(self):
+        return f"connect {self.connect}s / read {self.read}s"
+
+TIMEOUTS = AdaptiveTimeouts()
+
+def _header(headers, name):
+    # requests: CaseInsensitiveDict; async_tester: dict dengan key lowercase
+    return headers.get(name) or headers.get(name.lower())
+
+def is_github_rate_limited(status_code, headers, content=""):
+    """True jika respons GitHub adalah penolakan kuota/rate limit (primary atau secondary)."""
+    if status_code == 429: return True
+    if status_code != 403: return False
+    if _header(headers, "X-RateLimit-Remaining") == "0" or _header(headers, "Retry-After"): return True
+    return "rate limit" in (content or "")[:500].lower()
+
+class GitHubTokenPool:
+    """Rotasi token GitHub + pelacakan kuota per token (thread-safe).
+
+    acquire() memilih token berikutnya (round-robin) yang kuotanya belum habis; update()
+    mencatat X-RateLimit-Remaining/Reset dari respons dan menandai token habis sampai reset.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = []
+        self.state = {} # token -> {"remaining": int|None, "reset_at": epoch}
+        self.next_index = 0
+        self.rate_limited_hits = 0
+
+    def load(self, tokens):
+        with self.lock:
+            self.tokens = list(tokens)
+            self.state = {t: {"remaining": None, "reset_at": 0.0} for t in self.tokens}
+            self.next_index = 0
+            self.rate_limited_hits = 0
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def acquire(self):
+        """Return (token, 0) jika ada token tersedia, atau (None, detik sampai reset terdekat)."""
+        with self.lock:
+            if not self.tokens: return None, 0.0
+            now = time.time()
+            for offset in range(len(self.tokens)):
+                index = (self.next_index + offset) % len(self.tokens)
+                token = self.tokens[index]
+                state = self.state[token]
+                if state["remaining"] == 0 and state["reset_at"] > now: continue
+                if state["reset_at"] <= now and state["remaining"] == 0: state["remaining"] = None # Sudah reset
+                if state["remaining"] is not None: state["remaining"] -= 1 # Reservasi; dikoreksi oleh update()
+                self.next_index = index + 1
+                return token, 0.0
+            return None, max(0.0, min(self.state[t]["reset_at"] for t in self.tokens) - now)
+
+    def update(self, token, status_code, headers, content=""):
+        """Catat kuota dari header respons. Return True jika token ini kena rate limit."""
+        limited = is_github_rate_limited(status_code, headers, content)
+        remaining, reset = _header(headers, "X-RateLimit-Remaining"), _header(headers, "X-RateLimit-Reset")
+        with self.lock:
+            state = self.state.get(token)
+            if state is None: return limited
+            if remaining is not None and str(remaining).isdigit(): state["remaining"] = int(remaining)
+            if reset is not None and str(reset).isdigit(): state["reset_at"] = float(reset)
+            if limited:
+                self.rate_limited_hits += 1
+                state["remaining"] = 0
+                retry_after = _header(headers, "Retry-After")
+                cooldown = float(retry_after) if retry_after and str(retry_after).isdigit() else None
+                if cooldown is not None: state["reset_at"] = max(state["reset_at"], time.time() + cooldown)
+                elif state["reset_at"] <= time.time(): state["reset_at"] = time.time() + GITHUB_TOKEN_DEFAULT_COOLDOWN
+        return limited
+
+    def describe(self):
+        with self.lock:
+            now = time.time()
+            exhausted = sum(1 for s in self.state.values() if s["remaining"] == 0 and s["reset_at"] > now)
+            known = [s["remaining"] for s in self.state.values() if s["remaining"] is not None]
+        quota = f", sisa kuota ~{sum(known)}" if known else ""
+        return f"{len(self.tokens)} token, {exhausted} habis{quota}, {self.rate_limited_hits} respons rate-limit"
+
+GITHUB_TOKENS = GitHubTokenPool()
+
 # --- Variabel Global ---
-GITHUB_TEST_TOKEN = None
+GITHUB_TEST_TOKEN = None # Token pertama (kompatibilitas); rotasi memakai GITHUB_TOKENS
 
 def load_github_token(file_path = GITHUB_TOKENS_FILE):
     global GITHUB_TEST_TOKEN
@@ -41,22 +219,102 @@ def load_github_token(file_path = GITHUB_TOKENS_FILE):
             ui.console.print(f"[bold red]Error: Token awal di baris 3 '{os.path.basename(file_path)}' invalid.[/bold red]")
             return False
         # === AKHIR PERBAIKAN ===
+
+        # Semua token valid di baris 3 ikut dirotasi (duplikat & format salah dilewati)
+        tokens = []
+        for token in (t.strip() for t in tokens_line.split(',')):
+            if token.startswith(("ghp_", "github_pat_")) and token not in tokens: tokens.append(token)
+        skipped = len([t for t in tokens_line.split(',') if t.strip()]) - len(tokens)
             
         GITHUB_TEST_TOKEN = first_token
-        ui.console.print(f"[green]✓ Token GitHub untuk testing OK (dari baris 3).[/green]"); return True
+        GITHUB_TOKENS.load(tokens)
+        ui.console.print(f"[green]✓ {len(tokens)} token GitHub untuk testing OK (dari baris 3, dirotasi).[/green]")
+        if skipped > 0: ui.console.print(f"[yellow]   {skipped} token di baris 3 dilewati (duplikat/format invalid).[/yellow]")
+        return True
     except IndexError:
          ui.console.print(f"[bold red]Error: Baris 3 (tokens) di '{os.path.basename(file_path)}' format salah.[/bold red]"); return False
     except Exception as e: ui.console.print(f"[bold red]Gagal load token GitHub: {e}[/bold red]"); return False
 
+def build_connect_request(proxy, target_host, target_port=443):
+    """Bangun request CONNECT (bytes) untuk proxy http://[user:pass@]host:port."""
+    parts = urlsplit(proxy)
+    lines = [f"CONNECT {target_host}:{target_port} HTTP/1.1", f"Host: {target_host}:{target_port}"]
+    if parts.username is not None:
+        credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        lines.append(f"Proxy-Authorization: Basic {base64.b64encode(credentials.encode()).decode()}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+def parse_status_code(status_line):
+    """Ambil status code dari 'HTTP/1.1 200 ...'. Return 0 jika tidak valid."""
+    parts = status_line.split(b" ", 2)
+    return int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+
+def describe_os_error(e):
+    """Nama kelas error + kode errno (mis. 'OSError EMFILE') agar error lokal bisa dibedakan."""
+    code = errno.errorcode.get(e.errno) if getattr(e, "errno", None) else None
+    name = e.__class__.__name__
+    return f"{name} {code}" if code and name == "OSError" else name
+
+def get_prescreen_target(is_auto=False):
+    """Host tujuan CONNECT untuk pre-screen (sama dengan target tes tahap 2)."""
+    url = IP_TEST_TARGET if is_auto else GITHUB_TEST_TARGETS[0][1]
+    return urlsplit(url).hostname
+
+def is_plain_http_proxy(proxy):
+    """True untuk proxy http:// (CONNECT plaintext). Proxy https:// butuh TLS ke proxy dulu."""
+    return urlsplit(proxy).scheme.lower() in ("http", "")
+
+def prescreen_proxy(proxy, target_host, target_port=443, timeout=PRESCREEN_TIMEOUT):
+    """Tahap 1: TCP connect + CONNECT ke target. Return (ok, reason, timings).
+
+    TCP connect dibatasi TIMEOUTS.connect, handshake CONNECT dibatasi `timeout`.
+    """
+    parts = urlsplit(proxy)
+    timings = {}
+    connect_timeout = min(timeout, TIMEOUTS.connect)
+    try:
+        start = time.perf_counter()
+        sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=connect_timeout)
+    except socket.timeout:
+        return False, f"Prescreen Connect Timeout ({connect_timeout}s)", timings
+    except OSError as e:
+        return False, f"Prescreen TCP ({describe_os_error(e)})", timings
+    with sock:
+        timings["connect"] = elapsed_ms(start)
+        try:
+            sock.settimeout(timeout)
+            start = time.perf_counter()
+            sock.sendall(build_connect_request(proxy, target_host, target_port))
+            status_line = sock.makefile("rb").readline(1024)
+            timings["tunnel"] = elapsed_ms(start)
+        except socket.timeout:
+            return False, f"Prescreen Timeout ({timeout}s)", timings
+        except OSError as e:
+            return False, f"Prescreen TCP ({describe_os_error(e)})", timings
+
+    status = parse_status_code(status_line)
+    if status == 407: return False, "Proxy Auth (407)", timings
+    if status != 200: return False, f"Prescreen CONNECT ({status or 'invalid'})", timings
+    return True, "OK (prescreen)", timings
+
 # === PERBAIKAN: Terima flag is_auto ===
 def check_proxy_final(proxy, is_auto=False):
     
+    prescreen_timings = {}
+    if PRESCREEN_ENABLED and is_plain_http_proxy(proxy): # Pre-screen hanya bicara CONNECT plaintext
+        ok, reason, prescreen_timings = prescreen_proxy(proxy, get_prescreen_target(is_auto))
+        if not ok: return CheckResult(proxy, False, reason)
+
     if is_auto:
         # --- LOGIC BARU: Tes ke ipify.org (Mode Auto/Codespace) ---
-        return check_proxy_simple(proxy)
+        result = check_proxy_simple(proxy)
     else:
         # --- LOGIC LAMA: Tes ke GitHub (Mode Manual/Lokal) ---
-        return check_proxy_github(proxy)
+        result = check_proxy_github(proxy)
+    # Fase connect/tunnel pre-screen diukur di socket terpisah, bukan koneksi probe HTTP:
+    # cukup untuk timeout adaptif, tapi tidak ditulis ke hasil (skor hanya berisi ttfb/total)
+    if result[1]: TIMEOUTS.observe({**prescreen_timings, **result.timings})
+    return result
 # === AKHIR PERBAIKAN ===
 
 def check_proxy_simple(proxy):
@@ -68,36 +326,37 @@ def check_proxy_simple(proxy):
     }
 
     try:
-        response = requests.get(IP_TEST_TARGET, proxies=proxies_dict, timeout=PROXY_TIMEOUT, headers=headers)
+        start = time.perf_counter()
+        response = requests.get(IP_TEST_TARGET, proxies=proxies_dict, timeout=TIMEOUTS.as_requests_timeout(), headers=headers)
+        # requests tidak memisahkan fase TLS; elapsed = sampai header respons diterima
+        timings = {"ttfb": round(response.elapsed.total_seconds() * 1000, 1), "total": elapsed_ms(start)}
         
-        if response.status_code == 407: return proxy, False, "Proxy Auth (407)"
+        if response.status_code == 407: return CheckResult(proxy, False, "Proxy Auth (407)")
         response.raise_for_status() 
 
         # Cek apakah responsnya JSON valid dan ada key 'ip'
         data = response.json()
         if 'ip' in data:
-            return proxy, True, "OK (ipify.org)"
+            return CheckResult(proxy, True, "OK (ipify.org)", timings, exit_ip=str(data['ip']).strip())
         else:
-            return proxy, False, "Respons ipify?"
+            return CheckResult(proxy, False, "Respons ipify?")
 
+    except requests.exceptions.ConnectTimeout: 
+        return CheckResult(proxy, False, f"Connect Timeout ipify ({TIMEOUTS.connect}s)")
     except requests.exceptions.Timeout: 
-        return proxy, False, f"Timeout ipify ({PROXY_TIMEOUT}s)"
+        return CheckResult(proxy, False, f"Timeout ipify (read {TIMEOUTS.read}s)")
     except requests.exceptions.ProxyError as e: 
         reason = str(e).split(':')[-1].strip()
-        return proxy, False, f"Proxy Error ipify ({reason[:30]})"
+        return CheckResult(proxy, False, f"Proxy Error ipify ({reason[:30]})")
     except (requests.exceptions.RequestException, json.JSONDecodeError) as e: 
         reason = str(e.__class__.__name__)
-        return proxy, False, f"Koneksi Gagal ipify ({reason})"
+        return CheckResult(proxy, False, f"Koneksi Gagal ipify ({reason})")
 
-def check_proxy_github(proxy):
-    """Tes proxy akurat ke GitHub, butuh PAT."""
-    if GITHUB_TEST_TOKEN is None: 
-        return proxy, False, "Token GitHub?" 
-        
-    proxies_dict = {"http": proxy, "https": proxy}
+def github_test_headers(token=None):
+    """Header (api_headers, web_headers) untuk target tes GitHub (`token` default: token pertama)."""
     api_headers = {
         'User-Agent': 'ProxySync-Tester-GitHub/3.2', 
-        'Authorization': f'Bearer {GITHUB_TEST_TOKEN}', 
+        'Authorization': f'Bearer {token or GITHUB_TEST_TOKEN}', 
         'Accept': 'application/vnd.github.v3+json'
     }
     web_headers = {
@@ -105,35 +364,101 @@ def check_proxy_github(proxy):
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
         'Accept-Language': 'en-US,en;q=0.9',
     }
+    return api_headers, web_headers
+
+def split_github_targets():
+    """Pisahkan GITHUB_TEST_TARGETS jadi (target API, target web), urutan dipertahankan."""
+    api_targets = [t for t in GITHUB_TEST_TARGETS if "api.github.com" in t[1]]
+    web_targets = [t for t in GITHUB_TEST_TARGETS if "api.github.com" not in t[1]]
+    return api_targets, web_targets
 
-    for name, url in GITHUB_TEST_TARGETS:
+def github_status_reason(status_code, name):
+    """Reason gagal untuk status HTTP dari target GitHub, atau None jika status OK."""
+    if status_code == 401: return f"GitHub Auth ({name} 401)"
+    if status_code == 403: return f"GitHub Forbidden ({name} 403)"
+    if status_code == 407: return "Proxy Auth (407)"
+    if status_code == 429: return f"GitHub Rate Limit ({name} 429)"
+    if status_code >= 400: return f"Koneksi Gagal {name} (HTTP {status_code})"
+    return None
+
+def github_content_reason(content, name, is_api):
+    """Reason gagal jika isi respons target GitHub tidak wajar, atau None."""
+    if is_api:
+        if not (content and len(content) > 5): return f"Respons {name}?"
+    elif not (content and "github" in content.lower()[:1000]):
+        return f"Respons {name}?"
+    return None
+
+def _run_github_probes(session, proxies_dict, targets, api_headers, web_headers):
+    """Probe target GitHub berurutan lewat `session` (koneksi keep-alive dipakai ulang).
+
+    Return (reason gagal pertama atau None, timings probe pertama).
+    """
+    timings = {}
+    for name, url in targets:
         is_api = "api.github.com" in url
         headers = api_headers if is_api else web_headers
 
         try:
-            response = requests.get(url, proxies=proxies_dict, timeout=PROXY_TIMEOUT, headers=headers)
-
-            if response.status_code == 401: return proxy, False, f"GitHub Auth ({name} 401)"
-            if response.status_code == 403: return proxy, False, f"GitHub Forbidden ({name} 403)"
-            if response.status_code == 407: return proxy, False, "Proxy Auth (407)"
-            if response.status_code == 429: return proxy, False, f"GitHub Rate Limit ({name} 429)"
-            response.raise_for_status() 
-
-            content = response.text
-            if is_api:
-                if not (content and len(content) > 5):
-                    return proxy, False, f"Respons {name}?"
-            else:
-                if not (content and "github" in content.lower()[:1000]):
-                     return proxy, False, f"Respons {name}?"
+            attempts = 0
+            while True:
+                token = None
+                if is_api and len(GITHUB_TOKENS):
+                    token, wait_seconds = GITHUB_TOKENS.acquire()
+                    if token is None:
+                        # Semua token habis: jeda sampai reset jika cukup singkat, selain itu verdict rate-limit
+                        if wait_seconds > GITHUB_TOKEN_MAX_WAIT or attempts > len(GITHUB_TOKENS): return GITHUB_RATE_LIMIT_REASON, timings
+                        time.sleep(wait_seconds)
+                        attempts += 1
+                        continue
+                    headers = {**api_headers, 'Authorization': f'Bearer {token}'}
+                start = time.perf_counter()
+                response = session.get(url, proxies=proxies_dict, timeout=TIMEOUTS.as_requests_timeout(), headers=headers)
+                content = response.text # Body dibaca penuh agar koneksi kembali ke pool
+                if token is None or not GITHUB_TOKENS.update(token, response.status_code, response.headers, content): break
+                attempts += 1 # Token ini kena rate limit: ulangi dengan token lain
+                if attempts > len(GITHUB_TOKENS): return GITHUB_RATE_LIMIT_REASON, timings
+            if not timings: # Skor latency dari target pertama (API)
+                timings = {"ttfb": round(response.elapsed.total_seconds() * 1000, 1), "total": elapsed_ms(start)}
+
+            reason = github_status_reason(response.status_code, name) or github_content_reason(content, name, is_api)
+            if reason: return reason, timings
             
+        except requests.exceptions.ConnectTimeout: 
+            return f"Connect Timeout {name} ({TIMEOUTS.connect}s)", timings
         except requests.exceptions.Timeout: 
-            return proxy, False, f"Timeout {name} ({PROXY_TIMEOUT}s)"
+            return f"Timeout {name} (read {TIMEOUTS.read}s)", timings
         except requests.exceptions.ProxyError as e: 
             reason = str(e).split(':')[-1].strip()
-            return proxy, False, f"Proxy Error {name} ({reason[:30]})"
+            return f"Proxy Error {name} ({reason[:30]})", timings
         except requests.exceptions.RequestException as e: 
             reason = str(e.__class__.__name__)
-            return proxy, False, f"Koneksi Gagal {name} ({reason})"
-    
-    return proxy, True, "OK (All GitHub targets)"
+            return f"Koneksi Gagal {name} ({reason})", timings
+    return None, timings
+
+def check_proxy_github(proxy):
+    """Tes proxy akurat ke GitHub, butuh PAT.
+
+    Satu requests.Session per proxy: tunnel CONNECT + TLS ke github.com dibuka sekali
+    dan dipakai ulang untuk semua target web (keep-alive).
+    """
+    if GITHUB_TEST_TOKEN is None: 
+        return CheckResult(proxy, False, "Token GitHub?")
+        
+    proxies_dict = {"http": proxy, "https": proxy}
+    api_headers, web_headers = github_test_headers()
+    api_targets, web_targets = split_github_targets()
+
+    with requests.Session() as session:
+        if GITHUB_PROBE_CONCURRENT and api_targets and web_targets:
+            # Host berbeda = tunnel berbeda; probe web jalan di thread ini, API di thread kedua
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                api_future = pool.submit(_run_github_probes, session, proxies_dict, api_targets, api_headers, web_headers)
+                web_reason, _ = _run_github_probes(session, proxies_dict, web_targets, api_headers, web_headers)
+                api_reason, timings = api_future.result()
+            reason = api_reason or web_reason
+        else:
+            reason, timings = _run_github_probes(session, proxies_dict, GITHUB_TEST_TARGETS, api_headers, web_headers)
+
+    if reason: return CheckResult(proxy, False, reason, rate_limited=reason == GITHUB_RATE_LIMIT_REASON)
+    return CheckResult(proxy, True, "OK (All GitHub targets)", timings)
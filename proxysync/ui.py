@@ -1,8 +1,15 @@
 print("DEBUG: Starting ui.py execution", flush=True)
 import time
+import asyncio
+import contextlib
 import requests
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import ratelimit
+import scheduler
+import pipeline
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, as_completed
+from urllib.parse import urlsplit
 from rich.align import Align
 from rich.console import Console
 from rich.panel import Panel
@@ -29,6 +36,11 @@ except ImportError:
 
 console = Console()
 
+# --- Konfigurasi Download API ---
+API_DOWNLOAD_WORKERS = 8    # URL yang diunduh bersamaan (dibatasi lagi oleh rate limit per host)
+API_DOWNLOAD_RETRIES = 3
+API_DOWNLOAD_TIMEOUT = 60
+
 def print_header():
     """Menampilkan header aplikasi."""
     console.clear()
@@ -113,26 +125,47 @@ def display_main_menu():
         )
         return choice
 
-def fetch_from_api(url: str, api_key: str | None):
-    """Fungsi pembantu untuk mengunduh dari satu URL API."""
-    max_retries = 3
+def fetch_from_api(url: str, api_key: str | None, limiter=None, cache=None):
+    """Fungsi pembantu untuk mengunduh dari satu URL API.
+
+    Jika `limiter` (ratelimit.HostRateLimiter) diberikan, tiap request menunggu token host-nya
+    dan Retry-After dari 429/503 menahan seluruh request ke host tersebut.
+    Jika `cache` (download_cache.DownloadCache) diberikan, request dikirim kondisional
+    (ETag/Last-Modified); respons 304 memakai isi tersimpan.
+    """
+    host = urlsplit(url).hostname or ""
     headers = {} 
     if api_key:
         headers['Authorization'] = f"Token {api_key}" 
+    if cache is not None: headers.update(cache.conditional_headers(url))
 
-    for attempt in range(max_retries):
+    error_message = "Gagal tanpa respons"
+    for attempt in range(API_DOWNLOAD_RETRIES):
+        if limiter is not None: limiter.acquire(host)
         try:
-            response = requests.get(url, headers=headers, timeout=60) 
-            if response.status_code == 429:
-                wait_time = 15 * (attempt + 1) 
-                console.print(f"[yellow]Rate limit terdeteksi. Menunggu {wait_time} detik...[/yellow]")
-                time.sleep(wait_time)
+            response = requests.get(url, headers=headers, timeout=API_DOWNLOAD_TIMEOUT) 
+            if response.status_code == 429 or (response.status_code == 503 and "retry-after" in response.headers):
+                error_message = f"Rate limit (HTTP {response.status_code})"
+                retry_after = ratelimit.parse_retry_after(response.headers.get("Retry-After"))
+                wait_time = retry_after if retry_after is not None else ratelimit.backoff_delay(attempt)
+                console.print(f"[yellow]Rate limit {host}. Menunggu {wait_time:.1f} detik...[/yellow]")
+                if limiter is not None: limiter.penalize(host, wait_time)
+                else: time.sleep(wait_time)
                 continue 
+            if response.status_code == 304 and cache is not None:
+                cached_lines = cache.cached_lines(url)
+                if cached_lines is not None:
+                    cache.mark_unchanged(url)
+                    return url, cached_lines, None
+                error_message = "HTTP 304 tanpa isi cache"
+                break
             response.raise_for_status() 
             content = response.text.strip()
             if content:
                 if '\n' in content or re.match(r"^\d{1,3}(\.\d{1,3}){3}:\d+", content.splitlines()[0]):
-                    return url, content.splitlines(), None
+                    lines = content.splitlines()
+                    if cache is not None: cache.store(url, response.headers, lines)
+                    return url, lines, None
                 else:
                     error_message = "Respons tidak valid (bukan proxy list)"
                     break 
@@ -144,13 +177,19 @@ def fetch_from_api(url: str, api_key: str | None):
              break 
         except requests.exceptions.RequestException as e:
             error_message = f"Koneksi gagal: {str(e)[:50]}"
-            if attempt < max_retries - 1:
-                console.print(f"[yellow]Koneksi gagal, retry dalam 5 detik... ({attempt+1}/{max_retries})[/yellow]")
-                time.sleep(5) 
+            if attempt < API_DOWNLOAD_RETRIES - 1:
+                wait_time = ratelimit.backoff_delay(attempt)
+                console.print(f"[yellow]Koneksi gagal, retry dalam {wait_time:.1f} detik... ({attempt+1}/{API_DOWNLOAD_RETRIES})[/yellow]")
+                time.sleep(wait_time) 
     return url, [], error_message
 
-def run_sequential_api_downloads(download_targets: list[tuple[str, str | None]]):
-    """Menjalankan unduhan API satu per satu dengan progress tracking."""
+def run_parallel_api_downloads(download_targets: list[tuple[str, str | None]], max_workers=API_DOWNLOAD_WORKERS, cache=None, on_result=None, show_progress=True):
+    """Menjalankan unduhan API paralel (rate limit token bucket per host) dengan progress tracking.
+
+    `cache` (download_cache.DownloadCache) opsional: download kondisional per URL.
+    `on_result(url, proxies)` dipanggil begitu satu URL selesai (untuk pipeline streaming).
+    `show_progress=False` mematikan progress bar (mis. saat display tes sedang aktif).
+    """
     all_proxies = []
     
     progress = Progress(
@@ -164,42 +203,40 @@ def run_sequential_api_downloads(download_targets: list[tuple[str, str | None]])
     )
     
     total_targets = len(download_targets)
+    workers = max(1, min(max_workers, total_targets))
+    limiter = ratelimit.HostRateLimiter()
     
-    console.print(f"[cyan]Memulai download dari {total_targets} sumber API[/cyan]\n")
+    console.print(f"[cyan]Memulai download dari {total_targets} sumber API ({workers} paralel)[/cyan]\n")
     
-    with Live(progress, console=console, refresh_per_second=10):
+    live = Live(progress, console=console, refresh_per_second=10) if show_progress else contextlib.nullcontext()
+    with live:
         task = progress.add_task("[cyan]Mengunduh proxy list...", total=total_targets)
         
-        for i, (url, api_key) in enumerate(download_targets, 1):
-            progress.update(task, description=f"[cyan]Download {i}/{total_targets}")
-            _, proxies, error = fetch_from_api(url, api_key) 
-            
-            # Tampilkan URL yang lebih pendek
-            url_display = url[:50] + "..." if len(url) > 50 else url
-            
-            if error:
-                error_msg = str(error)[:40]
-                console.print(f"[red]FAIL[/red] {url_display} - {error_msg}")
-            else:
-                console.print(f"[green]OK[/green]   {url_display} - {len(proxies)} proxies")
-                all_proxies.extend(proxies)
-            
-            progress.update(task, advance=1)
-            
-            if i < total_targets:
-                time.sleep(5)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(fetch_from_api, url, api_key, limiter, cache) for url, api_key in download_targets]
+            for i, future in enumerate(as_completed(futures), 1):
+                url, proxies, error = future.result()
+                
+                # Tampilkan URL yang lebih pendek
+                url_display = url[:50] + "..." if len(url) > 50 else url
+                
+                if error:
+                    error_msg = str(error)[:40]
+                    console.print(f"[red]FAIL[/red] {url_display} - {error_msg}")
+                else:
+                    unchanged = " [dim](tidak berubah)[/dim]" if cache is not None and url in cache.unchanged_urls else ""
+                    console.print(f"[green]OK[/green]   {url_display} - {len(proxies)} proxies{unchanged}")
+                    all_proxies.extend(proxies)
+                    if on_result is not None: on_result(url, proxies)
+                
+                progress.update(task, advance=1, description=f"[cyan]Download {i}/{total_targets}")
     
     console.print()
     return all_proxies
 
-def run_concurrent_checks_display(proxies, check_function, max_workers, fail_file):
-    """Menampilkan progress bar untuk testing proxy."""
-    good_proxies, failed_proxies_with_reason = [], []
-    
-    console.print(f"[cyan]Memulai testing {len(proxies)} proxies[/cyan]")
-    console.print(f"[dim]Workers: {max_workers} threads | Timeout: 25s per proxy[/dim]\n")
-    
-    progress = Progress(
+def create_test_progress():
+    """Progress bar standar untuk testing proxy."""
+    return Progress(
         SpinnerColumn(spinner_name="dots"),
         TextColumn("[progress.description]{task.description}"),
         BarColumn(bar_width=50, style="cyan", complete_style="green"),
@@ -210,52 +247,276 @@ def run_concurrent_checks_display(proxies, check_function, max_workers, fail_fil
         TimeRemainingColumn(),
         console=console
     )
+
+def run_concurrent_checks_display(proxies, check_function, max_workers, fail_file, on_result=None, stop_after=None, controller=None, host_limit=None):
+    """Menampilkan progress bar untuk testing proxy.
+
+    Jika `stop_after` diisi, tes berhenti begitu jumlah proxy lolos mencapai angka itu;
+    cek yang belum jalan dibatalkan dan hasil cek yang masih berjalan diabaikan.
+    Jika `controller` (concurrency.AIMDController) diberikan, jumlah cek paralel
+    mengikuti controller.limit (maks controller.maximum) alih-alih `max_workers`.
+    Jika `host_limit` diisi, maks. sekian cek paralel per host proxy (gateway) dan
+    giliran dibagi round-robin antar host (scheduler.HostFairQueue).
+    Cek disubmit lewat jendela terbatas (limit saat ini) dan proxy gagal langsung ditulis
+    ke `fail_file`, jadi memori tidak tumbuh bersama ukuran list.
+    """
+    good_proxies, rate_limited_proxies = [], []
+    failures = pipeline.FailureLog(fail_file) # Proxy gagal langsung ditulis ke file, memori tetap datar
+    pool_size = controller.maximum if controller is not None else max_workers
+    current_limit = (lambda: controller.limit) if controller is not None else (lambda: max_workers)
+    streaming = hasattr(proxies, "take") # pipeline.ProxyStream / scheduler.SubnetScheduler: proxy datang bertahap
+    
+    console.print(f"[cyan]Memulai testing {describe_test_input(proxies)}[/cyan]")
+    if controller is not None:
+        console.print(f"[dim]Workers: adaptif {controller.limit} (maks {pool_size}) threads | Timeout: adaptif (connect/read per fase)[/dim]\n")
+    else:
+        console.print(f"[dim]Workers: {max_workers} threads | Timeout: adaptif (connect/read per fase)[/dim]\n")
+    
+    progress = create_test_progress()
     
     with Live(progress, console=console, refresh_per_second=10):
         task = progress.add_task("[cyan]Testing proxies...", total=len(proxies)) # Deskripsi diubah
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_proxy = {executor.submit(check_function, p): p for p in proxies}
-            
-            for future in as_completed(future_to_proxy):
-                proxy, is_good, message = future.result()
-                
-                if is_good:
-                    good_proxies.append(proxy)
+        executor = ThreadPoolExecutor(max_workers=pool_size)
+        fair = scheduler.HostFairQueue(proxies, host_limit) if host_limit else None
+        source = fair if fair is not None else proxies
+        proxy_iter = None if streaming or fair is not None else iter(proxies)
+        pending = {}
+
+        def fill_pending():
+            # Submit bertahap: hanya sebanyak limit saat ini yang berjalan/antre
+            while len(pending) < current_limit():
+                if proxy_iter is None:
+                    # Tunggu proxy baru hanya jika tidak ada cek yang berjalan
+                    p = source.take(block=not pending)
+                    if p is source.EMPTY: return
                 else:
-                    failed_proxies_with_reason.append((proxy, message))
-                
-                progress.update(task, advance=1)
+                    p = next(proxy_iter, None)
+                if p is None: return
+                pending[executor.submit(check_function, p)] = p
+
+        try:
+            fill_pending()
+            target_reached = False
+            while pending and not target_reached:
+                # Streaming: bangun berkala untuk mengambil proxy yang baru datang
+                done, _ = wait(pending, timeout=0.5 if streaming else None, return_when=FIRST_COMPLETED)
+                if streaming: progress.update(task, total=len(proxies))
+                for future in done:
+                    if target_reached: break # Sisa hasil di batch ini dibuang: tepat `stop_after` yang lolos
+                    p = pending.pop(future)
+                    try: result = future.result()
+                    except Exception as e: result = (p, False, describe_check_error(e)) # Sama seperti engine async
+                    proxy, is_good, message = result
+                    if fair is not None: fair.release(proxy)
+                    if on_result is not None: on_result(result)
+                    if controller is not None: controller.record(result)
+                    
+                    if is_good:
+                        good_proxies.append(proxy)
+                    elif getattr(result, "rate_limited", False):
+                        rate_limited_proxies.append(proxy) # Kuota token habis, bukan proxy gagal
+                    else:
+                        failures.record(proxy, message)
+                    
+                    progress.update(task, advance=1)
+                    if stop_after is not None and len(good_proxies) >= stop_after:
+                        progress.update(task, description=f"[green]Target {stop_after} proksi tercapai")
+                        target_reached = True
+                if not target_reached: fill_pending()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            failures.close()
     
     console.print()
+    if controller is not None: controller.print_summary()
+    print_test_summary(len(good_proxies) + failures.count + len(rate_limited_proxies), good_proxies, failures, rate_limited_proxies)
     
+    return good_proxies
+
+def run_async_checks_display(proxies, async_check_function, max_concurrency, fail_file, on_result=None, stop_after=None, controller=None, host_limit=None):
+    """Sama seperti run_concurrent_checks_display, tapi memakai engine asyncio.
+
+    `async_check_function` adalah coroutine function yang mengembalikan
+    (proxy, is_good, message), sama dengan kontrak tester.check_proxy_*.
+    Jika `on_result` diberikan, dipanggil dengan tiap hasil mentah (termasuk metrik).
+    Jika `stop_after` diisi, semua cek yang masih berjalan dibatalkan begitu target tercapai.
+    Jika `controller` diberikan, jumlah worker aktif mengikuti controller.limit dan
+    lag event loop ikut dilaporkan ke controller.
+    `host_limit`: sama seperti di run_concurrent_checks_display.
+    """
+    good_proxies, rate_limited_proxies = [], []
+    failures = pipeline.FailureLog(fail_file) # Proxy gagal langsung ditulis ke file, memori tetap datar
+    current_limit = (lambda: controller.limit) if controller is not None else (lambda: max_concurrency)
+    streaming = hasattr(proxies, "take") # pipeline.ProxyStream / scheduler.SubnetScheduler: proxy datang bertahap
+
+    console.print(f"[cyan]Memulai testing {describe_test_input(proxies)}[/cyan]")
+    if controller is not None:
+        console.print(f"[dim]Engine: asyncio | Concurrency: adaptif {controller.limit} (maks {controller.maximum}) | Timeout: adaptif (connect/read per fase)[/dim]\n")
+    else:
+        console.print(f"[dim]Engine: asyncio | Concurrency: {max_concurrency} | Timeout: adaptif (connect/read per fase)[/dim]\n")
+
+    progress = create_test_progress()
+
+    async def run_all(task):
+        fair = scheduler.HostFairQueue(proxies, host_limit) if host_limit else None
+        source = fair if fair is not None else proxies
+        proxy_iter = None if streaming or fair is not None else iter(proxies)
+        finished = asyncio.Event()
+        state = {"active": 0, "exhausted": False, "target_reached": False}
+        tasks = set()
+        slot_waiters = deque() # Future worker yang menunggu slot host (HostFairQueue penuh)
+
+        def wake_one():
+            # Dipanggil tiap fair.release() & saat worker berhenti: satu worker yang menunggu mencoba take() lagi
+            while slot_waiters:
+                waiter = slot_waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+
+        async def wait_for_slot():
+            waiter = asyncio.get_running_loop().create_future()
+            slot_waiters.append(waiter)
+            if not streaming:
+                await waiter
+                return
+            # Stream: proxy baru datang dari thread lain tanpa release, jadi tetap cek berkala
+            try:
+                await asyncio.wait_for(waiter, 0.2)
+            except asyncio.TimeoutError:
+                pass
+
+        def spawn_workers():
+            # Tambah worker sampai sejumlah limit saat ini (limit bisa naik selama tes)
+            while state["active"] < current_limit() and not state["exhausted"] and not state["target_reached"]:
+                state["active"] += 1
+                t = asyncio.create_task(worker())
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+
+        async def worker():
+            try:
+                # Semua worker menarik dari iterator yang sama (aman, single-thread event loop)
+                while not state["target_reached"]:
+                    if state["active"] > current_limit(): return # Limit turun: worker ini pensiun
+                    if proxy_iter is None:
+                        p = source.take(block=False) # Jangan blokir event loop
+                        if p is source.EMPTY:
+                            # Host penuh: tunggu cek lain selesai; streaming tanpa fairness: tunggu proxy baru
+                            if fair is not None: await wait_for_slot()
+                            else: await asyncio.sleep(0.2)
+                            continue
+                        if streaming: progress.update(task, total=len(proxies))
+                    else:
+                        p = next(proxy_iter, None)
+                    if p is None:
+                        state["exhausted"] = True
+                        return
+                    try:
+                        result = await async_check_function(p)
+                    except Exception as e: # Error tak terduga di fungsi cek: tetap jadi verdict gagal
+                        result = (p, False, describe_check_error(e))
+                    finally:
+                        if fair is not None:
+                            fair.release(p)
+                            wake_one()
+                    # Target sudah tercapai oleh cek lain: hasil ini dibuang (proxy tetap untested),
+                    # agar yang lolos, dicatat & disimpan tepat `stop_after`
+                    if state["target_reached"]: return
+                    proxy, is_good, message = result
+                    if on_result is not None: on_result(result)
+                    if controller is not None: controller.record(result)
+                    if is_good:
+                        good_proxies.append(proxy)
+                    elif getattr(result, "rate_limited", False):
+                        rate_limited_proxies.append(proxy) # Kuota token habis, bukan proxy gagal
+                    else:
+                        failures.record(proxy, message)
+                    progress.update(task, advance=1)
+                    if stop_after is not None and len(good_proxies) >= stop_after:
+                        state["target_reached"] = True
+                        progress.update(task, description=f"[green]Target {stop_after} proksi tercapai")
+                    spawn_workers()
+            finally:
+                state["active"] -= 1
+                wake_one() # Teruskan giliran: worker ini mungkin sudah menerima bangunan yang tidak dipakai
+                if state["active"] == 0 or state["target_reached"]: finished.set()
+
+        async def monitor_loop_lag(interval=0.25):
+            loop = asyncio.get_running_loop()
+            while True:
+                start = loop.time()
+                await asyncio.sleep(interval)
+                controller.record_loop_lag(loop.time() - start - interval)
+
+        monitor = asyncio.create_task(monitor_loop_lag()) if controller is not None else None
+        spawn_workers()
+        if state["active"] == 0: finished.set()
+        await finished.wait()
+        leftovers = list(tasks) + ([monitor] if monitor else [])
+        for t in leftovers: t.cancel()
+        await asyncio.gather(*leftovers, return_exceptions=True)
+
+    with Live(progress, console=console, refresh_per_second=10):
+        task = progress.add_task("[cyan]Testing proxies...", total=len(proxies))
+        try:
+            asyncio.run(run_all(task))
+        finally:
+            failures.close()
+
+    console.print()
+    if controller is not None: controller.print_summary()
+    print_test_summary(len(good_proxies) + failures.count + len(rate_limited_proxies), good_proxies, failures, rate_limited_proxies)
+
+    return good_proxies
+
+def describe_test_input(proxies):
+    if hasattr(proxies, "describe_input"): return proxies.describe_input()
+    if hasattr(proxies, "take"): return "proxy (streaming dari download)"
+    return f"{len(proxies)} proxies"
+
+def describe_check_error(e):
+    """Reason gagal untuk exception yang lolos dari fungsi cek (proxy tetap dapat verdict)."""
+    return f"Error Tes ({e.__class__.__name__}: {str(e)[:40]})"
+
+def print_test_summary(total, good_proxies, failures, rate_limited_proxies=None):
+    """Menampilkan ringkasan hasil tes (proxy gagal sudah ditulis bertahap oleh `failures`).
+
+    `failures` = pipeline.FailureLog. `rate_limited_proxies` (kuota token GitHub habis)
+    ditampilkan terpisah dan tidak masuk file gagal.
+    """
+    rate_limited_proxies = rate_limited_proxies or []
     # Results summary
     summary_table = Table(box=ROUNDED, border_style="cyan", show_header=True, header_style="bold white")
     summary_table.add_column("Status", justify="center", width=15)
     summary_table.add_column("Count", justify="center", width=10)
     summary_table.add_column("Percentage", justify="center", width=15)
     
-    total = len(proxies)
     success_count = len(good_proxies)
-    fail_count = len(failed_proxies_with_reason)
+    fail_count = failures.count
     success_pct = (success_count / total * 100) if total > 0 else 0
     fail_pct = (fail_count / total * 100) if total > 0 else 0
     
     summary_table.add_row("[green]PASSED[/green]", f"[green]{success_count}[/green]", f"[green]{success_pct:.1f}%[/green]")
     summary_table.add_row("[red]FAILED[/red]", f"[red]{fail_count}[/red]", f"[red]{fail_pct:.1f}%[/red]")
+    if rate_limited_proxies:
+        limited_pct = len(rate_limited_proxies) / total * 100 if total > 0 else 0
+        summary_table.add_row("[yellow]RATE LIMIT[/yellow]", f"[yellow]{len(rate_limited_proxies)}[/yellow]", f"[yellow]{limited_pct:.1f}%[/yellow]")
     summary_table.add_row("[cyan]TOTAL[/cyan]", f"{total}", "100%")
     
     console.print(Panel(summary_table, title="[bold]Test Results Summary[/bold]", border_style="cyan", box=ROUNDED))
+    if rate_limited_proxies:
+        console.print(f"[yellow]{len(rate_limited_proxies)} proxy tidak selesai dites karena kuota token GitHub habis (bukan gagal; dites ulang di run berikutnya).[/yellow]")
     
-    if failed_proxies_with_reason:
-        with open(fail_file, "w") as f:
-            for p, _ in failed_proxies_with_reason:
-                f.write(p + "\n")
-        
-        console.print(f"\n[yellow]{fail_count} failed proxies saved to '{fail_file}'[/yellow]")
+    if fail_count:
+        if failures.error is not None:
+            console.print(f"\n[bold red]Gagal menulis proxy gagal ke '{failures.path}': {failures.error}[/bold red]")
+        else:
+            console.print(f"\n[yellow]{fail_count} failed proxies saved to '{failures.path}'[/yellow]")
         
         # Error breakdown table (top 10 only)
-        if len(failed_proxies_with_reason) > 0:
+        if failures.sample:
             error_table = Table(
                 title="[bold red]Failure Analysis (Top 10)[/bold red]",
                 box=ROUNDED,
@@ -266,7 +527,7 @@ def run_concurrent_checks_display(proxies, check_function, max_workers, fail_fil
             error_table.add_column("Proxy", style="cyan", width=40)
             error_table.add_column("Reason", style="yellow")
             
-            for proxy, reason in failed_proxies_with_reason[:10]:
+            for proxy, reason in failures.sample[:10]:
                 proxy_display = proxy.split('@')[1] if '@' in proxy else proxy
                 if len(proxy_display) > 35:
                     proxy_display = proxy_display[:32] + "..."
@@ -274,8 +535,6 @@ def run_concurrent_checks_display(proxies, check_function, max_workers, fail_fil
             
             console.print()
             console.print(error_table)
-    
-    return good_proxies
 
 def manage_paths_menu_display():
     """Placeholder untuk menu manage paths."""
@@ -1,8 +1,10 @@
 import os
-import re
+import csv
 import shutil
 import random
 import ui # Mengimpor semua fungsi UI dari file ui.py
+import proxy_parser
+from ranking import rank_biased_shuffle
 from pathlib import Path
 
 # --- Konfigurasi Path ---
@@ -99,78 +101,82 @@ def save_discovered_url(file_path, url):
         return False
 # === AKHIR PERBAIKAN ===
 
-def convert_proxylist_to_http():
+def convert_proxy_line(p):
+    """Konversi satu baris proxy (ip:port, ip:port:user:pass, user:pass@host:port) ke format http://.
+
+    Return string proxy http(s):// atau None jika format tidak dikenali / port invalid.
+    """
+    proxy = proxy_parser.parse_proxy_line(p)
+    if proxy is not None: return proxy.url
+    if p.startswith("http://") or p.startswith("https://"): return p # Sudah http(s)://, diteruskan apa adanya
+    return None
+
+def _converted_line(line, url):
+    # Seperti convert_proxy_line, untuk pasangan (baris, url|None) dari proxy_parser.iter_proxy_urls()
+    if url is not None: return url
+    if line.startswith("http://") or line.startswith("https://"): return line
+    return None
+
+def convert_proxylist_to_http(skip_if_unchanged=False):
     if not os.path.exists(PROXYLIST_SOURCE_FILE):
         ui.console.print(f"[bold red]Error: '{os.path.basename(PROXYLIST_SOURCE_FILE)}' tidak ditemukan.[/bold red]")
         return False
+    if skip_if_unchanged and os.path.exists(PROXY_SOURCE_FILE) and os.path.getsize(PROXYLIST_SOURCE_FILE) == 0:
+        # proxylist.txt dikosongkan setelah konversi dan tidak diisi ulang = tidak ada download baru
+        ui.console.print(f"[dim]Tidak ada proxy baru di '{os.path.basename(PROXYLIST_SOURCE_FILE)}', '{os.path.basename(PROXY_SOURCE_FILE)}' dipakai apa adanya.[/dim]")
+        return True
+    # Baca (mmap) -> parse -> tulis baris per baris ke file sementara: memori tetap kecil untuk list multi-juta baris
+    tmp_path = PROXY_SOURCE_FILE + ".tmp"
+    total_count, converted_count, skipped_count, skipped_examples = 0, 0, 0, []
+    seen, duplicate_count = set(), 0 # Dedupe kanonik: format berbeda untuk endpoint yang sama cukup dites sekali
+    ui.console.print(f"Mengonversi proksi dari '{os.path.basename(PROXYLIST_SOURCE_FILE)}'...")
     try:
-        with open(PROXYLIST_SOURCE_FILE, "r") as f: lines = f.readlines()
+        os.makedirs(os.path.dirname(PROXY_SOURCE_FILE), exist_ok=True)
+        with open(tmp_path, "w") as out:
+            for line, url in proxy_parser.iter_proxy_urls(PROXYLIST_SOURCE_FILE):
+                total_count += 1
+                converted = _converted_line(line, url)
+                if converted in seen:
+                    duplicate_count += 1
+                elif converted:
+                    seen.add(converted)
+                    out.write(converted + "\n")
+                    converted_count += 1
+                else:
+                    skipped_count += 1
+                    if len(skipped_examples) < 5: skipped_examples.append(line)
     except Exception as e:
         ui.console.print(f"[bold red]Gagal membaca '{PROXYLIST_SOURCE_FILE}': {e}[/bold red]")
+        try: os.remove(tmp_path)
+        except OSError: pass
         return False
-    cleaned_proxies_input = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
-    if not cleaned_proxies_input:
+    if not total_count:
+        os.remove(tmp_path)
         ui.console.print(f"[yellow]'{os.path.basename(PROXYLIST_SOURCE_FILE)}' kosong atau hanya komentar.[/yellow]")
         if os.path.exists(PROXY_SOURCE_FILE):
             try: os.remove(PROXY_SOURCE_FILE)
             except OSError as e: ui.console.print(f"[yellow] Gagal menghapus '{os.path.basename(PROXY_SOURCE_FILE)}': {e}[/yellow]")
         return True
-    ui.console.print(f"Mengonversi {len(cleaned_proxies_input)} proksi dari '{os.path.basename(PROXYLIST_SOURCE_FILE)}'...")
-    converted_proxies, skipped_count, skipped_examples = [], 0, []
-    host_pattern = r"((?:[0-9]{1,3}\.){3}[0-9]{1,3}|(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,})"
-    port_pattern = r"[0-9]{1,5}"
-    for p in cleaned_proxies_input:
-        p = p.strip()
-        if not p: continue
-        if p.startswith("http://") or p.startswith("https://"):
-            converted_proxies.append(p); continue
-        converted = None
-        match_user_pass_host_port = re.match(rf"^(?P<user_pass>.+)@(?P<host>{host_pattern}):(?P<port>{port_pattern})$", p)
-        if match_user_pass_host_port:
-            user_pass = match_user_pass_host_port.group("user_pass")
-            host = match_user_pass_host_port.group("host")
-            port = match_user_pass_host_port.group("port")
-            try:
-                if 1 <= int(port) <= 65535: converted = f"http://{user_pass}@{host}:{port}"
-            except ValueError: pass
-        if not converted:
-            parts = p.split(':')
-            if len(parts) == 4:
-                ip, port, user, password = parts
-                if re.match(rf"^{host_pattern}$", ip) and re.match(rf"^{port_pattern}$", port):
-                    try:
-                        if 1 <= int(port) <= 65535: converted = f"http://{user}:{password}@{ip}:{port}"
-                    except ValueError: pass
-            elif len(parts) == 2:
-                ip, port = parts
-                if re.match(rf"^{host_pattern}$", ip) and re.match(rf"^{port_pattern}$", port):
-                     try:
-                         if 1 <= int(port) <= 65535: converted = f"http://{ip}:{port}"
-                     except ValueError: pass
-        if converted: converted_proxies.append(converted)
-        else:
-            skipped_count += 1
-            if len(skipped_examples) < 5: skipped_examples.append(p)
     if skipped_count > 0:
         ui.console.print(f"[yellow]{skipped_count} baris dilewati (format tidak dikenali/port invalid).[/yellow]")
         if skipped_examples:
             ui.console.print("[yellow]Contoh:[/yellow]")
             for ex in skipped_examples: ui.console.print(f"  - {ex}")
-    if not converted_proxies:
+    if not converted_count:
+        os.remove(tmp_path)
         ui.console.print("[bold red]Tidak ada proksi yang berhasil dikonversi.[/bold red]")
         if os.path.exists(PROXY_SOURCE_FILE):
              try: os.remove(PROXY_SOURCE_FILE)
              except OSError as e: ui.console.print(f"[yellow] Gagal menghapus '{os.path.basename(PROXY_SOURCE_FILE)}': {e}[/yellow]")
         return False
     try:
-        os.makedirs(os.path.dirname(PROXY_SOURCE_FILE), exist_ok=True)
-        with open(PROXY_SOURCE_FILE, "w") as f:
-            for proxy in converted_proxies: f.write(proxy + "\n")
+        os.replace(tmp_path, PROXY_SOURCE_FILE)
         if os.path.exists(PROXYLIST_SOURCE_FILE):
              open(PROXYLIST_SOURCE_FILE, "w").close()
              ui.console.print(f"[bold cyan]   '{os.path.basename(PROXYLIST_SOURCE_FILE)}' dikosongkan.[/bold cyan]")
 
-        ui.console.print(f"[bold green]✅ {len(converted_proxies)} proksi dikonversi -> '{os.path.basename(PROXY_SOURCE_FILE)}'.[/bold green]")
+        ui.console.print(f"[bold green]✅ {converted_count} dari {total_count} proksi dikonversi -> '{os.path.basename(PROXY_SOURCE_FILE)}'.[/bold green]")
+        if duplicate_count > 0: ui.console.print(f"[dim]   ({duplicate_count} duplikat (beda format, endpoint sama) dihapus)[/dim]")
         return True
     except Exception as e:
         ui.console.print(f"[bold red]Gagal menulis ke file: {e}[/bold red]")
@@ -184,7 +190,8 @@ def load_and_deduplicate_proxies(file_path):
 
     if not proxies: ui.console.print(f"[yellow]File proxy '{os.path.basename(file_path)}' kosong.[/yellow]"); return []
 
-    unique_proxies = sorted(list(set(proxies)))
+    # Dinormalisasi ke bentuk kanonik (http://, host lowercase) lalu dedupe pada bentuk itu
+    unique_proxies = sorted({proxy_parser.canonical_key(p) for p in proxies})
     duplicates_removed = len(proxies) - len(unique_proxies)
     if duplicates_removed > 0: ui.console.print(f"[dim]   ({duplicates_removed} duplikat dihapus dari '{os.path.basename(file_path)}') [/dim]")
     return unique_proxies
@@ -230,8 +237,12 @@ def backup_file(file_path, backup_path):
     else:
        ui.console.print(f"[dim]File '{os.path.basename(file_path)}' tidak ada, backup dilewati.[/dim]")
 
-def distribute_proxies(proxies, paths):
+def distribute_proxies(proxies, paths, prefer_fastest=False):
     if not proxies or not paths: ui.console.print("[yellow]Distribusi proxy dilewati (tidak ada proxy valid atau path target).[/yellow]"); return
+    unique_proxies = proxy_parser.dedupe(proxies) # Urutan (ranking) dipertahankan
+    if len(unique_proxies) < len(proxies):
+        ui.console.print(f"[dim]   ({len(proxies) - len(unique_proxies)} duplikat dihapus sebelum distribusi)[/dim]")
+        proxies = unique_proxies
     ui.console.print(f"\n[cyan]Mendistribusikan {len(proxies)} proksi valid ke {len(paths)} path target...[/cyan]")
     project_root_abs = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
     success_count = 0
@@ -249,7 +260,7 @@ def distribute_proxies(proxies, paths):
              if proxy_file_path_alt.exists():
                  proxy_file_path = proxy_file_path_alt
                  target_filename = "proxy.txt"
-        proxies_shuffled = random.sample(proxies, len(proxies))
+        proxies_shuffled = rank_biased_shuffle(proxies) if prefer_fastest else random.sample(proxies, len(proxies))
         try:
             with open(proxy_file_path, "w") as f:
                 for proxy in proxies_shuffled: f.write(proxy + "\n")
@@ -272,3 +283,26 @@ def save_good_proxies(proxies, file_path):
     except IOError as e:
         ui.console.print(f"\n[bold red]✖ Gagal menyimpan proksi valid ke '{os.path.basename(file_path)}': {e}[/bold red]")
         return False
+
+
+SCORE_COLUMNS = ["rank", "proxy", "score", "latency_ms", "connect_ms", "tunnel_ms", "tls_ms", "ttfb_ms", "success_rate", "exit_ip"]
+
+def save_proxy_scores(score_rows, file_path):
+    """Simpan sidecar CSV berisi skor latency tiap proxy valid (urut sesuai ranking).
+
+    Kolom connect_ms/tunnel_ms/tls_ms kosong untuk hasil engine thread (hanya engine
+    async yang mengukur fase pada koneksi tes) dan ttfb_ms-nya termasuk setup koneksi;
+    ranking hanya memakai latency_ms (total), yang diukur sama oleh kedua engine.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SCORE_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for rank, row in enumerate(score_rows, 1):
+                writer.writerow({**row, "rank": rank})
+        ui.console.print(f"[dim]   Skor latency disimpan ke '{os.path.basename(file_path)}'[/dim]")
+        return True
+    except IOError as e:
+        ui.console.print(f"[yellow]Gagal menyimpan skor ke '{os.path.basename(file_path)}': {e}[/yellow]")
+        return False
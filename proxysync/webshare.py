@@ -2,13 +2,19 @@ import os
 import sys
 import json
 import time
+import hashlib
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 import ui # Mengimpor semua fungsi UI dari file ui.py
+import proxydb
 
 # --- Konfigurasi Path ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, '..', 'config'))
 WEBSHARE_APIKEYS_FILE = os.path.join(CONFIG_DIR, "apikeys.txt")
+ACCOUNT_CACHE_FILE = os.path.join(SCRIPT_DIR, "webshare_account_cache.json") # Cache email & /config/ per akun
 
 # --- Konfigurasi Webshare ---
 WEBSHARE_AUTH_URL = "https://proxy.webshare.io/api/v2/proxy/ipauthorization/"
@@ -22,126 +28,328 @@ IP_CHECK_SERVICE_URL = "https://api.ipify.org?format=json"
 # Timeout API Webshare
 WEBSHARE_API_TIMEOUT = 60
 
+# Cache metadata akun (email, plan id, download token). Dibuang otomatis saat API membalas 401.
+ACCOUNT_CACHE_TTL = 12 * 3600
+# IP yang terakhir berhasil disinkronkan per akun: jika IP publik sama, sync akun dilewati tanpa
+# panggilan API. Tetap dicek ulang ke API setelah umur ini (atau dengan --force-ip-sync).
+IP_SYNC_RECHECK_SECONDS = 24 * 3600
+FORCE_IP_SYNC = False
+
+# --- Konfigurasi Sinkronisasi Paralel ---
+SYNC_ACCOUNT_WORKERS = 4    # Akun Webshare yang diproses bersamaan
+SYNC_DELETE_WORKERS = 4     # DELETE IP lama yang dikirim bersamaan per akun
+VERIFY_POLL_INITIAL = 0.5   # Detik; jeda awal polling verifikasi IP baru
+VERIFY_POLL_MAX = 4         # Jeda polling maksimum (backoff x2)
+VERIFY_POLL_TIMEOUT = 20    # Batas total menunggu IP baru muncul di daftar
+
 # Import utilitas load API keys (dipindah ke utils.py)
 from utils import load_webshare_apikeys
 
-def get_current_public_ip():
-    ui.console.print("1. Mengecek IP publik saat ini...")
+class AccountLog:
+    """Penampung output per akun; dicetak utuh lewat flush() agar log akun paralel tidak bercampur."""
+    def __init__(self):
+        self.lines = []
+
+    def __call__(self, message="", **kwargs):
+        self.lines.append(message)
+
+    def flush(self):
+        for line in self.lines: ui.console.print(line)
+        self.lines = []
+
+class AccountCache:
+    """Cache metadata akun Webshare di disk (JSON), kunci = hash API key (key asli tidak disimpan).
+
+    Tiap field punya timestamp sendiri dan dianggap basi setelah `ttl` detik. Thread-safe.
+    """
+
+    def __init__(self, path=ACCOUNT_CACHE_FILE, ttl=ACCOUNT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = self._load()
+
+    @staticmethod
+    def key_for(api_key):
+        return hashlib.sha256(api_key.encode()).hexdigest()[:32]
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f: return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f: json.dump(self.entries, f)
+            os.chmod(tmp_path, 0o600) # Berisi download token
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass # Cache hanya optimasi; kegagalan tulis tidak fatal
+
+    def get(self, key, field, max_age=None):
+        """Nilai field jika lebih muda dari `max_age` detik (default: ttl cache), selain itu None."""
+        with self.lock:
+            entry = self.entries.get(key, {}).get(field)
+        if entry and time.time() - entry["cached_at"] < (self.ttl if max_age is None else max_age): return entry["value"]
+        return None
+
+    def put(self, key, field, value):
+        with self.lock:
+            self.entries.setdefault(key, {})[field] = {"value": value, "cached_at": time.time()}
+            self._save()
+
+    def invalidate(self, key):
+        with self.lock:
+            if self.entries.pop(key, None) is not None: self._save()
+
+ACCOUNT_CACHE = AccountCache()
+
+def create_webshare_session(api_key):
+    """Session ber-pool untuk satu akun (header auth terpasang), dipakai semua panggilan akun itu.
+
+    `session.account_key` mengaktifkan ACCOUNT_CACHE; respons 401 apa pun membuang cache akun ini.
+    `session.api_calls` menghitung respons API yang benar-benar diterima (0 = semua dari cache).
+    """
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Token {api_key}", "Accept": "application/json"})
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SYNC_DELETE_WORKERS)
+    session.mount("https://", adapter)
+    session.account_key = AccountCache.key_for(api_key)
+    session.api_calls = 0
+
+    def on_response(response, *args, **kwargs):
+        session.api_calls += 1
+        if response.status_code == 401: ACCOUNT_CACHE.invalidate(session.account_key)
+    session.hooks["response"].append(on_response)
+    return session
+
+LAST_PUBLIC_IP = None # IP publik terakhir yang dilaporkan get_current_public_ip (proses ini)
+
+def get_current_public_ip(log=ui.console.print, timeout=WEBSHARE_API_TIMEOUT):
+    """IP publik saat ini, atau None. Verdict cache dari IP publik lain ikut dibuang (proxydb)."""
+    global LAST_PUBLIC_IP
+    log("1. Mengecek IP publik saat ini...")
     try:
-        response = requests.get(IP_CHECK_SERVICE_URL, timeout=WEBSHARE_API_TIMEOUT)
+        response = requests.get(IP_CHECK_SERVICE_URL, timeout=timeout)
         response.raise_for_status()
         current_ip = response.json()["ip"]
-        ui.console.print(f"   -> [bold green]IP publik saat ini: {current_ip}[/bold green]")
-        return current_ip
+        log(f"   -> [bold green]IP publik saat ini: {current_ip}[/bold green]")
     except requests.RequestException as e:
-        ui.console.print(f"   -> [bold red]ERROR: Gagal mengecek IP publik: {e}[/bold red]", file=sys.stderr)
+        log(f"   -> [bold red]ERROR: Gagal mengecek IP publik: {e}[/bold red]", file=sys.stderr)
         return None
     except (KeyError, json.JSONDecodeError) as e:
-         ui.console.print(f"   -> [bold red]ERROR: Respons IP publik tidak valid: {e}[/bold red]", file=sys.stderr)
+         log(f"   -> [bold red]ERROR: Respons IP publik tidak valid: {e}[/bold red]", file=sys.stderr)
          return None
+    if current_ip != LAST_PUBLIC_IP:
+        invalidated = proxydb.note_public_ip(current_ip)
+        if invalidated: ui.console.print(f"   -> [yellow]IP publik berubah ({current_ip}): {invalidated} verdict cache dari IP lama dibuang.[/yellow]")
+    LAST_PUBLIC_IP = current_ip
+    return current_ip
 
 def get_account_email(session: requests.Session) -> str:
+    account_key = getattr(session, "account_key", None)
+    cached_email = ACCOUNT_CACHE.get(account_key, "email") if account_key else None
+    if cached_email: return cached_email
     try:
         response = session.get(WEBSHARE_PROFILE_URL, timeout=WEBSHARE_API_TIMEOUT)
         if response.status_code == 401: return "[bold red]API Key Invalid[/]"
         response.raise_for_status()
         data = response.json()
         email = data.get("email")
-        if email: return email
+        if email:
+            if account_key: ACCOUNT_CACHE.put(account_key, "email", email)
+            return email
         else: return "[yellow]Email tidak tersedia[/]"
     except requests.exceptions.HTTPError as e: return f"[bold red]HTTP Error ({e.response.status_code})[/]"
     except requests.RequestException: return "[bold red]Koneksi Error[/]"
     except Exception: return "[bold red]Parsing Error[/]"
 
-def get_target_plan_id(session: requests.Session):
-    ui.console.print("2. Mengecek Plan ID Webshare (via /config/)...")
+def get_account_config(session: requests.Session):
+    """Respons /config/ akun (plan id + download token). Return (config, dari_cache).
+
+    Satu fetch dipakai bersama untuk plan id & URL download; raise requests.RequestException jika gagal.
+    """
+    account_key = getattr(session, "account_key", None)
+    cached = ACCOUNT_CACHE.get(account_key, "config") if account_key else None
+    if cached is not None: return cached, True
+    response = session.get(WEBSHARE_CONFIG_URL, timeout=WEBSHARE_API_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    config = {"id": data.get("id"), "proxy_list_download_token": data.get("proxy_list_download_token")}
+    if account_key and config["id"]: ACCOUNT_CACHE.put(account_key, "config", config)
+    return config, False
+
+def get_target_plan_id(session: requests.Session, log=ui.console.print):
+    log("2. Mengecek Plan ID Webshare (via /config/)...")
     try:
-        response = session.get(WEBSHARE_CONFIG_URL, timeout=WEBSHARE_API_TIMEOUT)
-        if response.status_code == 401: ui.console.print("   -> [bold red]ERROR: API Key Webshare invalid.[/bold red]"); return None
-        response.raise_for_status()
-        data = response.json()
+        data, from_cache = get_account_config(session)
         plan_id = data.get("id")
         if plan_id:
             plan_id_str = str(plan_id)
-            ui.console.print(f"   -> [green]OK: Plan ID ditemukan: {plan_id_str}[/green]")
+            log(f"   -> [green]OK: Plan ID ditemukan: {plan_id_str}{' (cache)' if from_cache else ''}[/green]")
             return plan_id_str
         else:
-            ui.console.print("   -> [bold red]ERROR: Respons API /config/ tidak mengandung field 'id'.[/bold red]")
+            log("   -> [bold red]ERROR: Respons API /config/ tidak mengandung field 'id'.[/bold red]")
             return None
     except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 401: log("   -> [bold red]ERROR: API Key Webshare invalid.[/bold red]"); return None
         error_detail = ""
         try: error_detail = f" - {e.response.json().get('detail', e.response.text)}"
         except: error_detail = f" - {e.response.text}"
-        ui.console.print(f"   -> [bold red]ERROR HTTP {e.response.status_code} saat akses /config/{error_detail}[/bold red]")
+        log(f"   -> [bold red]ERROR HTTP {e.response.status_code} saat akses /config/{error_detail}[/bold red]")
         return None
     except requests.RequestException as e:
-        ui.console.print(f"   -> [bold red]ERROR Koneksi saat akses /config/: {e}[/bold red]")
+        log(f"   -> [bold red]ERROR Koneksi saat akses /config/: {e}[/bold red]")
         return None
     except Exception as e:
-         ui.console.print(f"   -> [bold red]ERROR tak terduga saat mencari Plan ID: {e}[/bold red]")
+         log(f"   -> [bold red]ERROR tak terduga saat mencari Plan ID: {e}[/bold red]")
          return None
 
 
-def get_authorized_ips(session: requests.Session, plan_id: str):
-    ui.console.print("3. Mengecek IP yang sudah terdaftar...")
-    params = {"plan_id": plan_id}
+def list_authorized_ips(session: requests.Session, plan_id: str):
+    """Dict {ip: authorization_id} untuk plan; raise requests.RequestException jika gagal."""
+    response = session.get(WEBSHARE_AUTH_URL, params={"plan_id": plan_id}, timeout=WEBSHARE_API_TIMEOUT)
+    response.raise_for_status()
     ip_to_id_map = {}
-    try:
-        response = session.get(WEBSHARE_AUTH_URL, params=params, timeout=WEBSHARE_API_TIMEOUT)
-        response.raise_for_status()
-        results = response.json().get("results", [])
-        for item in results:
-            ip = item.get("ip_address")
-            auth_id = item.get("id")
-            if ip and auth_id: ip_to_id_map[ip] = auth_id
+    for item in response.json().get("results", []):
+        ip = item.get("ip_address")
+        auth_id = item.get("id")
+        if ip and auth_id: ip_to_id_map[ip] = auth_id
+    return ip_to_id_map
 
+def get_authorized_ips(session: requests.Session, plan_id: str, log=ui.console.print):
+    log("3. Mengecek IP yang sudah terdaftar...")
+    try:
+        ip_to_id_map = list_authorized_ips(session, plan_id)
         if not ip_to_id_map:
-            ui.console.print("   -> Tidak ada IP lama yang terdaftar untuk plan ini.")
+            log("   -> Tidak ada IP lama yang terdaftar untuk plan ini.")
         else:
-            ui.console.print(f"   -> IP lama yang terdaftar: {', '.join(ip_to_id_map.keys())}")
+            log(f"   -> IP lama yang terdaftar: {', '.join(ip_to_id_map.keys())}")
         return ip_to_id_map
     except requests.RequestException as e:
-        ui.console.print(f"   -> [bold red]ERROR: Gagal mengecek IP lama: {e}[/bold red]")
+        log(f"   -> [bold red]ERROR: Gagal mengecek IP lama: {e}[/bold red]")
         return {}
 
-def remove_ip(session: requests.Session, ip: str, authorization_id: int, plan_id: str):
-    ui.console.print(f"   -> Menghapus IP lama: {ip} (ID: {authorization_id})...", end=" ")
+def remove_ip(session: requests.Session, ip: str, authorization_id: int, plan_id: str, log=ui.console.print):
+    prefix = f"   -> Menghapus IP lama: {ip} (ID: {authorization_id})..." # Satu baris per IP (aman untuk DELETE paralel)
     params = {"plan_id": plan_id}
     delete_url = f"{WEBSHARE_AUTH_URL}{authorization_id}/"
     try:
         response = session.delete(delete_url, params=params, timeout=WEBSHARE_API_TIMEOUT)
         if response.status_code == 204:
-            ui.console.print(f"[green]OK[/green]")
+            log(f"{prefix} [green]OK[/green]")
             return True
         else:
             error_detail = ""
             try: error_detail = f" - {response.json().get('detail', response.text)}"
             except: error_detail = f" - {response.text}"
-            ui.console.print(f"[bold red]GAGAL ({response.status_code}){error_detail}[/bold red]")
+            log(f"{prefix} [bold red]GAGAL ({response.status_code}){error_detail}[/bold red]")
             return False
     except requests.RequestException as e:
-        ui.console.print(f"[bold red]GAGAL (Koneksi Error): {e}[/bold red]")
+        log(f"{prefix} [bold red]GAGAL (Koneksi Error): {e}[/bold red]")
         return False
 
-def add_ip(session: requests.Session, ip: str, plan_id: str):
-    ui.console.print(f"   -> Menambahkan IP baru: {ip}...", end=" ")
+def add_ip(session: requests.Session, ip: str, plan_id: str, log=ui.console.print):
+    prefix = f"   -> Menambahkan IP baru: {ip}..."
     params = {"plan_id": plan_id}
     payload = {"ip_address": ip}
     try:
         response = session.post(WEBSHARE_AUTH_URL, json=payload, params=params, timeout=WEBSHARE_API_TIMEOUT)
         if response.status_code == 201:
-            ui.console.print(f"[green]OK[/green]")
+            log(f"{prefix} [green]OK[/green]")
             return True
         else:
             error_detail = ""
             try: error_detail = f" - {response.json().get('detail', response.text)}"
             except: error_detail = f" - {response.text}"
-            ui.console.print(f"[bold red]GAGAL ({response.status_code}){error_detail}[/bold red]")
+            log(f"{prefix} [bold red]GAGAL ({response.status_code}){error_detail}[/bold red]")
             return False
     except requests.RequestException as e:
-        ui.console.print(f"[bold red]GAGAL (Koneksi Error): {e}[/bold red]")
+        log(f"{prefix} [bold red]GAGAL (Koneksi Error): {e}[/bold red]")
         return False
 
+def remove_ips_concurrently(session: requests.Session, ip_map: dict, plan_id: str, log=ui.console.print):
+    """DELETE semua IP di `ip_map` secara paralel. Return True jika semua berhasil."""
+    workers = max(1, min(SYNC_DELETE_WORKERS, len(ip_map)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(remove_ip, session, ip, auth_id, plan_id, log) for ip, auth_id in ip_map.items()]
+        return all(f.result() for f in futures)
+
+def wait_for_authorized_ip(session: requests.Session, plan_id: str, ip: str):
+    """Polling daftar IP (backoff x2) sampai `ip` muncul atau VERIFY_POLL_TIMEOUT habis.
+
+    Return authorization id `ip` jika muncul, selain itu None.
+    """
+    deadline = time.monotonic() + VERIFY_POLL_TIMEOUT
+    delay = VERIFY_POLL_INITIAL
+    while True:
+        try:
+            auth_id = list_authorized_ips(session, plan_id).get(ip)
+            if auth_id: return auth_id
+        except requests.RequestException:
+            pass # Coba lagi di polling berikutnya
+        if time.monotonic() + delay > deadline: return None
+        time.sleep(delay)
+        delay = min(delay * 2, VERIFY_POLL_MAX)
+
+def remember_synced_ip(account_key, ip, authorization_id, plan_id):
+    ACCOUNT_CACHE.put(account_key, "synced_ip", {"ip": ip, "authorization_id": authorization_id, "plan_id": plan_id})
+
+def sync_account_ip(api_key, new_ip, log=ui.console.print):
+    """Sinkronkan IP otorisasi satu akun Webshare. Return True jika IP baru terdaftar.
+
+    Jika `new_ip` sama dengan IP yang terakhir berhasil disinkronkan akun ini (dan belum
+    lewat IP_SYNC_RECHECK_SECONDS), akun dilewati tanpa panggilan API.
+    """
+    account_key = AccountCache.key_for(api_key)
+    synced = None if FORCE_IP_SYNC else ACCOUNT_CACHE.get(account_key, "synced_ip", max_age=IP_SYNC_RECHECK_SECONDS)
+    if synced and synced.get("ip") == new_ip:
+        log(f"\n--- Key: [...{api_key[-6:]}] --- [green]IP {new_ip} sudah tersinkron (ID: {synced.get('authorization_id')}, cache). Dilewati.[/green]")
+        return True
+    with create_webshare_session(api_key) as session:
+        try: account_email_info = get_account_email(session)
+        except Exception: account_email_info = "[bold red]Error[/]"
+        log(f"\n--- Memproses Key: [...{api_key[-6:]}] (Email: {account_email_info}) ---")
+
+        try:
+            plan_id = get_target_plan_id(session, log)
+            if not plan_id:
+                log(f"   -> [bold red]Gagal mendapatkan Plan ID. Akun ini dilewati.[/bold red]")
+                return False
+
+            authorized_ips_map = get_authorized_ips(session, plan_id, log)
+            if new_ip in authorized_ips_map:
+                log(f"   -> [green]IP baru ({new_ip}) sudah terdaftar. Tidak perlu tindakan.[/green]")
+                remember_synced_ip(account_key, new_ip, authorized_ips_map[new_ip], plan_id)
+                return True
+
+            account_success = True
+            log("\n4. Menghapus IP lama (jika ada)...")
+            if not authorized_ips_map:
+                log("   -> Tidak ada IP lama untuk dihapus.")
+            elif remove_ips_concurrently(session, authorized_ips_map, plan_id, log):
+                log("   -> Semua IP lama berhasil dihapus.")
+            else:
+                log("   -> [yellow]Beberapa IP lama gagal dihapus.[/yellow]")
+                account_success = False
+
+            log("\n5. Menambahkan IP baru...")
+            if not add_ip(session, new_ip, plan_id, log): return False
+            log("   -> Verifikasi penambahan IP...")
+            authorization_id = wait_for_authorized_ip(session, plan_id, new_ip)
+            if authorization_id:
+                log(f"   -> [green]Verifikasi OK: IP {new_ip} berhasil ditambahkan.[/green]")
+                if account_success: remember_synced_ip(account_key, new_ip, authorization_id, plan_id)
+                return account_success
+            log(f"   -> [bold red]Verifikasi GAGAL: IP {new_ip} tidak ditemukan setelah proses add![/bold red]")
+            return False
+
+        except Exception as e:
+            log(f"   -> [bold red]!!! TERJADI ERROR tak terduga saat memproses akun ini: {e}. Lanjut ke akun berikutnya.[/bold red]")
+            return False
+
 def run_webshare_ip_sync():
     ui.print_header()
     ui.console.print("[bold cyan]--- Sinkronisasi IP Otorisasi Webshare ---[/bold cyan]")
@@ -151,70 +359,22 @@ def run_webshare_ip_sync():
     new_ip = get_current_public_ip()
     if not new_ip: ui.console.print("[bold red]Gagal mendapatkan IP publik saat ini. Proses dibatalkan.[/bold red]"); return False
 
-    ui.console.print(f"\nSinkronisasi IP [bold]{new_ip}[/bold] ke [bold]{len(api_keys)}[/bold] akun Webshare...")
+    workers = max(1, min(SYNC_ACCOUNT_WORKERS, len(api_keys)))
+    ui.console.print(f"\nSinkronisasi IP [bold]{new_ip}[/bold] ke [bold]{len(api_keys)}[/bold] akun Webshare ({workers} paralel)...")
     overall_success = True
 
-    for api_key in api_keys:
-        account_email_info = "[grey]Mencoba mendapatkan email...[/]"
-        try:
-            with requests.Session() as email_session:
-                email_session.headers.update({"Authorization": f"Token {api_key}", "Accept": "application/json"})
-                account_email_info = get_account_email(email_session)
-        except Exception: account_email_info = "[bold red]Error[/]"
-        ui.console.print(f"\n--- Memproses Key: [...{api_key[-6:]}] (Email: {account_email_info}) ---")
-
-        account_success = False
-        with requests.Session() as session:
-            session.headers.update({"Authorization": f"Token {api_key}", "Accept": "application/json"})
-            try:
-                plan_id = get_target_plan_id(session)
-                if not plan_id:
-                    ui.console.print(f"   -> [bold red]Gagal mendapatkan Plan ID. Akun ini dilewati.[/bold red]")
-                    overall_success = False
-                    continue
-
-                authorized_ips_map = get_authorized_ips(session, plan_id)
-                existing_ips = list(authorized_ips_map.keys())
-
-                if new_ip in existing_ips:
-                    ui.console.print(f"   -> [green]IP baru ({new_ip}) sudah terdaftar. Tidak perlu tindakan.[/green]")
-                    account_success = True
-                else:
-                    ui.console.print("\n4. Menghapus IP lama (jika ada)...")
-                    remove_success = True
-                    if not existing_ips:
-                        ui.console.print("   -> Tidak ada IP lama untuk dihapus.")
-                    else:
-                        ips_to_remove = list(authorized_ips_map.items())
-                        for ip_to_delete, auth_id_to_delete in ips_to_remove:
-                            if not remove_ip(session, ip_to_delete, auth_id_to_delete, plan_id):
-                                remove_success = False
-                                overall_success = False
-                        if remove_success: ui.console.print("   -> Semua IP lama berhasil dihapus.")
-                        else: ui.console.print("   -> [yellow]Beberapa IP lama gagal dihapus.[/yellow]")
-
-                    ui.console.print("\n5. Menambahkan IP baru...")
-                    add_success = add_ip(session, new_ip, plan_id)
-                    if add_success:
-                        ui.console.print("   -> Verifikasi penambahan IP...")
-                        time.sleep(3)
-                        updated_ips_map = get_authorized_ips(session, plan_id) # Baca ulang setelah add
-                        if new_ip in updated_ips_map:
-                            ui.console.print(f"   -> [green]Verifikasi OK: IP {new_ip} berhasil ditambahkan.[/green]")
-                            account_success = True
-                        else:
-                             ui.console.print(f"   -> [bold red]Verifikasi GAGAL: IP {new_ip} tidak ditemukan setelah proses add![/bold red]")
-                             overall_success = False
-                    else:
-                        overall_success = False
-
-            except Exception as e:
-                ui.console.print(f"   -> [bold red]!!! TERJADI ERROR tak terduga saat memproses akun ini: {e}. Lanjut ke akun berikutnya.[/bold red]")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for api_key in api_keys:
+            log = AccountLog()
+            futures[executor.submit(sync_account_ip, api_key, new_ip, log)] = (api_key, log)
+        for future in as_completed(futures):
+            api_key, log = futures[future]
+            account_success = future.result()
+            if not account_success:
+                log(f"   -> [yellow]Proses untuk key [...{api_key[-6:]}] tidak sepenuhnya berhasil.[/yellow]")
                 overall_success = False
-                continue
-
-        if not account_success:
-             ui.console.print(f"   -> [yellow]Proses untuk key [...{api_key[-6:]}] tidak sepenuhnya berhasil.[/yellow]")
+            log.flush() # Log akun dicetak utuh begitu akun selesai
 
     ui.console.print("\n-------------------------------------------")
     if overall_success:
@@ -225,11 +385,12 @@ def run_webshare_ip_sync():
 
 def get_webshare_download_url(session: requests.Session, plan_id: str):
     ui.console.print("   -> Mencari URL download proxy (via /config/)...")
-    params = {"plan_id": plan_id}
     try:
-        response = session.get(WEBSHARE_CONFIG_URL, params=params, timeout=WEBSHARE_API_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
+        data, _ = get_account_config(session) # Respons yang sama dengan get_target_plan_id
+        if str(data.get("id")) != str(plan_id): # Plan lain: minta config spesifik plan itu
+            response = session.get(WEBSHARE_CONFIG_URL, params={"plan_id": plan_id}, timeout=WEBSHARE_API_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
         token = data.get("proxy_list_download_token")
         if not token:
             ui.console.print("   -> [bold red]ERROR: 'proxy_list_download_token' tidak ditemukan dalam respons API.[/bold red]")
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+PROXYSYNC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "proxysync")
+sys.path.insert(0, PROXYSYNC_DIR)
+
+import flows
+import journal
+import proxydb
+import tester
+import webshare
+
+LIVE_SUBNET = [f"http://10.0.0.{i}:80" for i in range(1, 64)]
+DEAD_SUBNET = [f"http://10.0.1.{i}:80" for i in range(1, 64)]
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """Semua file state flows di tmp_path, tes proxy palsu: /24 10.0.1.x mati (connection refused)."""
+    for name in ("PROXY_SOURCE_FILE", "FAIL_PROXY_FILE", "SUCCESS_PROXY_FILE", "SUCCESS_SCORES_FILE",
+                 "UNTESTED_PROXY_FILE", "TESTED_INPUT_FILE", "SHORT_CIRCUIT_FILE"):
+        monkeypatch.setattr(flows, name, str(tmp_path / name.lower()))
+    # Path default argumen terikat saat import: ikut dialihkan
+    monkeypatch.setattr(flows.load_tested_snapshot, "__defaults__", (flows.TESTED_INPUT_FILE, flows.DIFF_VERDICT_MAX_AGE))
+    monkeypatch.setattr(flows.save_tested_snapshot, "__defaults__", (None, None, flows.TESTED_INPUT_FILE))
+    monkeypatch.setattr(flows.has_untested_leftovers, "__defaults__", (flows.UNTESTED_PROXY_FILE,))
+    health_db_file = str(tmp_path / "proxy_health.db")
+    monkeypatch.setattr(proxydb.open_health_db, "__defaults__", (health_db_file,))
+    monkeypatch.setattr(proxydb.note_public_ip, "__defaults__", (health_db_file,))
+    monkeypatch.setattr(journal.VerdictJournal.__init__, "__defaults__", (str(tmp_path / "test_journal.jsonl"),))
+    monkeypatch.setattr(flows, "ADAPTIVE_CONCURRENCY", False)
+    monkeypatch.setattr(webshare, "LAST_PUBLIC_IP", "203.0.113.7")
+
+    checked = []
+    def fake_check(proxy, is_auto=False):
+        checked.append(proxy)
+        if proxy in DEAD_SUBNET: return tester.CheckResult(proxy, False, "ConnectionRefusedError: Connection refused")
+        return tester.CheckResult(proxy, True, "OK", timings={"total": 120.0})
+    monkeypatch.setattr(tester, "check_proxy_final", fake_check)
+
+    with open(flows.PROXY_SOURCE_FILE, "w") as f:
+        for p in LIVE_SUBNET + DEAD_SUBNET: f.write(p + "\n")
+    return checked
+
+def test_unchanged_input_with_dead_subnet_skips_second_run(sandbox):
+    checked = sandbox
+    assert flows.run_automated_test_and_save(is_auto=True)
+    assert 0 < len(checked) < len(LIVE_SUBNET + DEAD_SUBNET) # Sisa /24 mati di-short-circuit
+    assert not flows.has_untested_leftovers()
+    with open(flows.FAIL_PROXY_FILE) as f:
+        assert set(f.read().split()) == set(DEAD_SUBNET)
+
+    checked.clear()
+    assert flows.run_automated_test_and_save(is_auto=True)
+    assert checked == []
+    with open(flows.SUCCESS_PROXY_FILE) as f:
+        assert len(f.read().split()) == len(LIVE_SUBNET)
+
+def test_want_leftovers_come_from_health_db(sandbox):
+    assert flows.run_automated_test_and_save(is_auto=True, want="10")
+    with open(flows.SUCCESS_PROXY_FILE) as f: good = f.read().split()
+    with open(flows.UNTESTED_PROXY_FILE) as f: untested = f.read().split()
+    assert len(good) == 10
+    assert not set(good) & set(untested)
+    with proxydb.open_health_db() as db: # Tepat proxy tanpa verdict yang tersisa sebagai untested
+        assert set(db.get_many(LIVE_SUBNET + DEAD_SUBNET)) == set(LIVE_SUBNET + DEAD_SUBNET) - set(untested)